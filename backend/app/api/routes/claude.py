@@ -4,6 +4,8 @@ Provides endpoints for interacting with Claude Code SDK for AI-powered code assi
 Supports streaming responses and custom tool integration.
 """
 
+import asyncio
+import os
 from typing import Any
 
 from fastapi import APIRouter, HTTPException
@@ -11,7 +13,12 @@ from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 
 from app.api.deps import SessionDep
-from app.crud import create_claude_session
+from app.crud import (
+    ClaudeSessionCreate,
+    create_claude_session,
+    get_claude_session,
+    get_claude_session_messages,
+)
 from app.utils import query_claude_stream
 
 router = APIRouter(prefix="/claude", tags=["claude"])
@@ -84,7 +91,6 @@ async def query_claude_endpoint(request: ClaudeQueryRequest, session: SessionDep
         current_session_id = request.session_id
         if not current_session_id:
             # Create new session
-            from app.crud import ClaudeSessionCreate
             new_session = await create_claude_session(
                 session=session,
                 session_in=ClaudeSessionCreate(user_id=request.user_id, state={})
@@ -94,13 +100,12 @@ async def query_claude_endpoint(request: ClaudeQueryRequest, session: SessionDep
         # Handle working directory if specified
         cwd = None
         if request.working_directory:
-            import os
-
+            # Filesystem calls run in a worker thread so slow disks don't stall the event loop
             # Check if directory exists
-            if not os.path.exists(request.working_directory):
+            if not await asyncio.to_thread(os.path.exists, request.working_directory):
                 if request.create_directory:
                     # Create directory and all parent directories
-                    os.makedirs(request.working_directory, exist_ok=True)
+                    await asyncio.to_thread(os.makedirs, request.working_directory, exist_ok=True)
                 else:
                     raise HTTPException(
                         status_code=400,
@@ -109,7 +114,7 @@ async def query_claude_endpoint(request: ClaudeQueryRequest, session: SessionDep
                     )
 
             # Verify it's actually a directory
-            if not os.path.isdir(request.working_directory):
+            if not await asyncio.to_thread(os.path.isdir, request.working_directory):
                 raise HTTPException(
                     status_code=400,
                     detail=f"Path '{request.working_directory}' exists but is not a directory."
@@ -136,14 +141,17 @@ async def query_claude_endpoint(request: ClaudeQueryRequest, session: SessionDep
 
 
 @router.get("/sessions/{session_id}")
-async def get_claude_session_endpoint(session_id: str, session: SessionDep):
+async def get_claude_session_endpoint(session_id: str, session: SessionDep, skip: int = 0, limit: int = 100):
     """Get Claude session state by ID.
 
-    Retrieves the current state of a Claude conversation session.
+    Retrieves the current state of a Claude conversation session, along with a
+    page of its message history (oldest first).
 
     Args:
         session_id: Unique identifier for the Claude session
         session: Database session
+        skip: Number of history messages to skip
+        limit: Maximum number of history messages to return
 
     Returns:
         Session state information
@@ -151,9 +159,7 @@ async def get_claude_session_endpoint(session_id: str, session: SessionDep):
     Raises:
         HTTPException: If session not found
     """
-    from app.crud import get_claude_session as get_session_crud
-
-    db_session = await get_session_crud(session=session, session_id=session_id)
+    db_session = await get_claude_session(session=session, session_id=session_id)
     if not db_session:
         raise HTTPException(status_code=404, detail="Session not found")
 
@@ -161,6 +167,9 @@ async def get_claude_session_endpoint(session_id: str, session: SessionDep):
         "id": db_session.id,
         "user_id": db_session.user_id,
         "session_data": db_session.session_data,
+        "messages": await get_claude_session_messages(
+            session=session, session_id=session_id, skip=skip, limit=limit
+        ),
         "working_directory": db_session.working_directory,
         "created_at": db_session.created_at,
         "updated_at": db_session.updated_at,
@@ -1,9 +1,12 @@
 """GitHub integration routes."""
 
+import asyncio
+import configparser
 import os
-import subprocess
+import re
 from pathlib import Path
 
+import pygit2
 from fastapi import APIRouter, HTTPException
 
 from app.schemas.github import CreatePRRequest, CreatePRResponse
@@ -15,6 +18,46 @@ from app.integrations.github import (
 
 router = APIRouter(prefix="/github", tags=["github"])
 
+# owner/repo from HTTPS (https://github.com/o/r.git) and SSH (git@github.com:o/r.git) remotes
+_GH_URL_RE = re.compile(r"github\.com[:/]([^/]+/[^/]+?)(?:\.git)?/?$")
+
+
+def _read_origin_url(work_dir: Path) -> str:
+    """Read the origin remote URL straight from the repository's git config.
+
+    Avoids spawning ``git remote get-url origin`` for a value that lives in a
+    plain INI-style file. Worktrees and submodules, whose ``.git`` is a file
+    pointing at the real git directory, are followed to the shared config.
+
+    Args:
+        work_dir: Root of the git working tree
+
+    Returns:
+        The configured URL of the origin remote
+
+    Raises:
+        ValueError: If the directory is not a git repository or has no origin
+    """
+    git_dir = work_dir / ".git"
+    if git_dir.is_file():
+        pointer = git_dir.read_text().strip()
+        if not pointer.startswith("gitdir:"):
+            raise ValueError(f"Not a git repository: {work_dir}")
+        git_dir = (work_dir / pointer[len("gitdir:"):].strip()).resolve()
+        # Linked worktrees keep their config in the main repository's git dir
+        commondir = git_dir / "commondir"
+        if commondir.is_file():
+            git_dir = (git_dir / commondir.read_text().strip()).resolve()
+
+    config = configparser.ConfigParser(strict=False, interpolation=None)
+    if not config.read(git_dir / "config"):
+        raise ValueError(f"Not a git repository: {work_dir}")
+
+    try:
+        return config['remote "origin"']["url"]
+    except KeyError:
+        raise ValueError("Working directory has no 'origin' remote") from None
+
 
 @router.post("/create-pr", response_model=CreatePRResponse)
 async def create_pull_request(request: CreatePRRequest) -> CreatePRResponse:
@@ -62,34 +105,25 @@ async def create_pull_request(request: CreatePRRequest) -> CreatePRResponse:
             )
 
         # Get repo from git remote
-        logger.info("Running git remote get-url origin")
-        result = subprocess.run(
-            ["git", "remote", "get-url", "origin"],
-            cwd=work_dir,
-            capture_output=True,
-            text=True,
-            check=True
-        )
-        remote_url = result.stdout.strip()
+        logger.info("Reading origin remote from git config")
+        remote_url = _read_origin_url(work_dir)
         logger.info(f"Remote URL: {remote_url}")
 
         # Extract owner/repo from URL
-        if "github.com/" in remote_url:
-            repo_part = remote_url.split("github.com/")[-1]
-            if repo_part.endswith(".git"):
-                repo_part = repo_part[:-4]
-            repo = repo_part
-            logger.info(f"Extracted repo: {repo}")
-        else:
+        match = _GH_URL_RE.search(remote_url)
+        if not match:
             logger.error("Working directory is not a GitHub repository")
             raise HTTPException(
                 status_code=400,
                 detail="Working directory is not a GitHub repository"
             )
+        repo = match.group(1)
+        logger.info(f"Extracted repo: {repo}")
 
         # Get installation token
         logger.info(f"Getting installation token for app {app_id} and repo {repo}")
-        installation_token = get_installation_token(
+        installation_token = await asyncio.to_thread(
+            get_installation_token,
             int(app_id),
             private_key_b64,
             repo
@@ -103,7 +137,7 @@ async def create_pull_request(request: CreatePRRequest) -> CreatePRResponse:
 
         # Create PR
         logger.info("Creating PR from changes")
-        pr_url = create_pr_from_changes(
+        pr_url = await create_pr_from_changes(
             request.working_directory,
             request.body,
             github_client,
@@ -114,10 +148,10 @@ async def create_pull_request(request: CreatePRRequest) -> CreatePRResponse:
 
         return CreatePRResponse(pr_url=pr_url)
 
-    except subprocess.CalledProcessError as e:
+    except pygit2.GitError as e:
         raise HTTPException(
             status_code=400,
-            detail=f"Git operation failed: {e.stderr}"
+            detail=f"Git operation failed: {e}"
         )
     except ValueError as e:
         raise HTTPException(
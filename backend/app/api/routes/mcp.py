@@ -5,12 +5,22 @@ of their capabilities including tools, resources, and prompts.
 """
 
 import asyncio
-import json
+from functools import partial
+from pathlib import Path
 from typing import Any
 
+import orjson
+from cachetools import TTLCache
 from fastapi import APIRouter, HTTPException
-from pydantic import ValidationError
-
+from pydantic import TypeAdapter, ValidationError
+
+from app.core.config import settings
+from app.core.log_config import logger
+from app.integrations.mcp import (
+    MCPRequestError,
+    discard_mcp_session,
+    get_mcp_session,
+)
 from app.schemas.mcp import (
     MCPInspectRequest,
     MCPPromptSchema,
@@ -21,6 +31,29 @@ from app.schemas.mcp import (
 
 router = APIRouter(prefix="/mcp", tags=["mcp"])
 
+# Path to installed mcptools binary, resolved once since no shell is involved
+_MCPTOOLS_BINARY = Path(settings.MCPTOOLS_PATH).expanduser()
+_MCPTOOLS_PATH = str(_MCPTOOLS_BINARY)
+_MCPTOOLS_AVAILABLE = _MCPTOOLS_BINARY.is_file()
+if not _MCPTOOLS_AVAILABLE:
+    logger.warning(f"mcptools not found at {_MCPTOOLS_PATH}; remote MCP inspection is unavailable")
+# URL schemes and transport names; returned as shared constants from detect_transport_type
+_HTTP_SCHEMES = ("http://", "https://")
+_SSE, _HTTP, _STDIO = "sse", "http", "stdio"
+# Returned in place of output when a server doesn't support a capability
+_METHOD_NOT_FOUND = b"error: method not found"
+
+# Recently built snapshots keyed by (server_spec, transport_type)
+_snapshot_cache: "TTLCache[tuple[str, str], MCPSnapshot]" = TTLCache(maxsize=256, ttl=60)
+# In-flight inspections keyed by (server_spec, transport_type, timeout), so concurrent
+# misses for the same server share one run
+_snapshot_inflight: "dict[tuple[str, str, int], asyncio.Task[MCPSnapshot]]" = {}
+
+# Whole-list validators; the per-item loops only run when a listing has a bad entry
+_TOOLS_ADAPTER = TypeAdapter(list[MCPToolSchema])
+_RESOURCES_ADAPTER = TypeAdapter(list[MCPResourceSchema])
+_PROMPTS_ADAPTER = TypeAdapter(list[MCPPromptSchema])
+
 
 def detect_transport_type(server_spec: str) -> str:
     """Detect the transport type based on the server specification.
@@ -31,31 +64,37 @@ def detect_transport_type(server_spec: str) -> str:
     Returns:
         Transport type: "http", "sse", or "stdio"
     """
-    if server_spec.startswith("http://") or server_spec.startswith("https://"):
-        if server_spec.endswith("/sse"):
-            return "sse"
-        else:
-            return "http"
-    else:
-        return "stdio"
+    if server_spec.startswith(_HTTP_SCHEMES):
+        return _SSE if server_spec.endswith("/sse") else _HTTP
+    return _STDIO
 
 
-async def run_mcptools_command(command: str, timeout: int = 30) -> str:
+async def run_mcptools_command(argv: list[str], timeout: int = 30) -> bytes:
     """Execute a mcptools command asynchronously with timeout.
 
+    The command is executed directly rather than through a shell, so the
+    server specification is passed as a single argument and never parsed.
+
     Args:
-        command: The mcptools command to execute
+        argv: The mcptools executable followed by its arguments
         timeout: Timeout in seconds
 
     Returns:
-        Command output as string, or "error: Method not found" if capability not supported
+        Raw command output, or b"error: method not found" if capability not supported
 
     Raises:
-        HTTPException: If command times out or fails (except "Method not found")
+        HTTPException: If mcptools is not installed, or the command times out or
+            fails (except "Method not found")
     """
+    if not _MCPTOOLS_AVAILABLE:
+        raise HTTPException(
+            status_code=503,
+            detail=f"mcptools is not installed at {_MCPTOOLS_PATH}"
+        )
+
     try:
-        process = await asyncio.create_subprocess_shell(
-            command,
+        process = await asyncio.create_subprocess_exec(
+            *argv,
             stdout=asyncio.subprocess.PIPE,
             stderr=asyncio.subprocess.PIPE,
         )
@@ -65,12 +104,12 @@ async def run_mcptools_command(command: str, timeout: int = 30) -> str:
             timeout=timeout
         )
 
-        output = stdout.decode().strip()
+        # stdout is handed to orjson as-is; only the (short) stderr is decoded
         error_output = stderr.decode().strip()
 
         # If the command returns "Method not found", that's expected for unsupported capabilities
-        if "error: Method not found" in error_output.lower():
-            return "error: Method not found"
+        if _METHOD_NOT_FOUND.decode() in error_output.lower():
+            return _METHOD_NOT_FOUND
 
         if process.returncode != 0:
             error_msg = error_output if error_output else "Unknown error"
@@ -79,7 +118,7 @@ async def run_mcptools_command(command: str, timeout: int = 30) -> str:
                 detail=f"mcptools command failed: {error_msg}"
             )
 
-        return output
+        return stdout
 
     except asyncio.TimeoutError:
         raise HTTPException(
@@ -96,7 +135,7 @@ async def run_mcptools_command(command: str, timeout: int = 30) -> str:
         )
 
 
-def parse_mcptools_json(output: str) -> dict[str, Any]:
+def parse_mcptools_json(output: bytes) -> dict[str, Any]:
     """Parse JSON output from mcptools, handling error cases.
 
     Args:
@@ -106,17 +145,18 @@ def parse_mcptools_json(output: str) -> dict[str, Any]:
         Parsed JSON data or empty dict for "Method not found" errors
     """
     # Handle "Method not found" errors gracefully
-    if output.strip().lower() == "error: method not found":
+    # Length check first so large listings aren't copied by strip()/lower()
+    if len(output) < 64 and output.strip().lower() == _METHOD_NOT_FOUND:
         return {}
 
     try:
-        return json.loads(output)
-    except json.JSONDecodeError:
+        return orjson.loads(output)
+    except orjson.JSONDecodeError:
         # If it's not valid JSON and not a "Method not found" error,
         # treat it as an unexpected error
         raise HTTPException(
             status_code=502,
-            detail=f"Invalid JSON response from mcptools: {output[:200]}..."
+            detail=f"Invalid JSON response from mcptools: {output[:200].decode(errors='replace')}..."
         )
 
 
@@ -129,9 +169,13 @@ def parse_tools_data(data: dict[str, Any]) -> list[MCPToolSchema]:
     Returns:
         List of MCPToolSchema objects
     """
-    tools: list[MCPToolSchema] = []
     tools_list = data.get("tools", [])
+    try:
+        return _TOOLS_ADAPTER.validate_python(tools_list)
+    except ValidationError:
+        pass
 
+    tools: list[MCPToolSchema] = []
     for tool_data in tools_list:
         try:
             # Use model_validate to properly handle aliases
@@ -139,10 +183,10 @@ def parse_tools_data(data: dict[str, Any]) -> list[MCPToolSchema]:
             tools.append(tool)
         except ValidationError as e:
             # Log validation error but continue with other tools
-            print(f"Warning: Failed to parse tool {tool_data.get('name', 'unknown')}: {e}")
+            logger.warning("Failed to parse tool {}: {}", tool_data.get("name", "unknown"), e)
             continue
         except Exception as e:
-            print(f"Warning: Unexpected error parsing tool {tool_data.get('name', 'unknown')}: {e}")
+            logger.warning("Unexpected error parsing tool {}: {}", tool_data.get("name", "unknown"), e)
             continue
     return tools
 
@@ -156,18 +200,20 @@ def parse_resources_data(data: dict[str, Any]) -> list[MCPResourceSchema]:
     Returns:
         List of MCPResourceSchema objects
     """
+    resources_list = data.get("resources", [])
+    try:
+        return _RESOURCES_ADAPTER.validate_python(resources_list)
+    except ValidationError:
+        pass
+
     resources: list[MCPResourceSchema] = []
-    for resource_data in data.get("resources", []):
+    for resource_data in resources_list:
         try:
-            # Handle the mimeType field (note: mcptools uses mimeType, not mime_type)
-            resource_dict = dict(resource_data)
-            if "mimeType" in resource_dict:
-                resource_dict["mime_type"] = resource_dict.pop("mimeType")
-
-            resources.append(MCPResourceSchema(**resource_dict))
+            # model_validate maps mcptools' mimeType through the field alias
+            resources.append(MCPResourceSchema.model_validate(resource_data))
         except ValidationError as e:
             # Log validation error but continue with other resources
-            print(f"Warning: Failed to parse resource {resource_data.get('uri', 'unknown')}: {e}")
+            logger.warning("Failed to parse resource {}: {}", resource_data.get("uri", "unknown"), e)
             continue
 
     return resources
@@ -182,63 +228,93 @@ def parse_prompts_data(data: dict[str, Any]) -> list[MCPPromptSchema]:
     Returns:
         List of MCPPromptSchema objects
     """
+    prompts_list = data.get("prompts", [])
+    try:
+        return _PROMPTS_ADAPTER.validate_python(prompts_list)
+    except ValidationError:
+        pass
+
     prompts: list[MCPPromptSchema] = []
-    for prompt_data in data.get("prompts", []):
+    for prompt_data in prompts_list:
         try:
-            prompts.append(MCPPromptSchema(**prompt_data))
+            prompts.append(MCPPromptSchema.model_validate(prompt_data))
         except ValidationError as e:
             # Log validation error but continue with other prompts
-            print(f"Warning: Failed to parse prompt {prompt_data.get('name', 'unknown')}: {e}")
+            logger.warning("Failed to parse prompt {}: {}", prompt_data.get("name", "unknown"), e)
             continue
 
     return prompts
 
 
-@router.post("/inspect", response_model=MCPSnapshot)
-async def inspect_mcp_server(request: MCPInspectRequest) -> MCPSnapshot:
-    """Inspect an MCP server and return a complete snapshot of its capabilities.
+async def inspect_stdio_server(
+    server_spec: str, timeout: int
+) -> tuple[dict[str, Any], dict[str, Any], dict[str, Any], str]:
+    """List a local MCP server's capabilities over a persistent stdio session.
 
-    This endpoint executes mcptools commands to gather comprehensive information
-    about an MCP server's tools, resources, and prompts. It supports both remote
-    MCP servers (via HTTP/SSE) and local MCP setup commands.
+    The three listings are issued concurrently on the same session.
 
     Args:
-        request: Inspection request containing either a URL or command
+        server_spec: Command that launches the MCP server
+        timeout: Timeout in seconds for connecting and listing
 
     Returns:
-        Complete MCP server snapshot with tools, resources, and prompts
+        Tools, resources and prompts data shaped like mcptools JSON output,
+        plus the negotiated protocol version
 
     Raises:
-        HTTPException: For invalid requests, timeouts, or server errors
+        HTTPException: If the server cannot be started, times out, or errors
     """
-    # Determine the server specification (URL or command)
-    if request.url:
-        server_spec = request.url
-    elif request.command:
-        server_spec = request.command
-    else:
-        # This should be caught by Pydantic validation, but just in case
-        raise HTTPException(
-            status_code=400,
-            detail="Either 'url' or 'command' must be provided"
+    async def list_all() -> tuple[dict[str, Any], dict[str, Any], dict[str, Any], str]:
+        session = await get_mcp_session(server_spec)
+        tools_data, resources_data, prompts_data = await asyncio.gather(
+            session.list_capability("tools"),
+            session.list_capability("resources"),
+            session.list_capability("prompts"),
         )
+        return tools_data, resources_data, prompts_data, session.protocol_version
 
-    # Detect transport type
-    transport_type = detect_transport_type(server_spec)
+    try:
+        return await asyncio.wait_for(list_all(), timeout=timeout)
+    except asyncio.TimeoutError:
+        # A server that stops answering is not worth keeping around
+        await discard_mcp_session(server_spec)
+        raise HTTPException(
+            status_code=408,
+            detail=f"MCP server timed out after {timeout} seconds"
+        ) from None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid MCP server command: {e!s}") from e
+    except (OSError, MCPRequestError) as e:
+        await discard_mcp_session(server_spec)
+        raise HTTPException(status_code=502, detail=f"MCP server request failed: {e!s}") from e
 
-    # Build mcptools commands
-    mcptools_path = "~/go/bin/mcptools"  # Path to installed mcptools binary
 
-    tools_cmd = f'{mcptools_path} tools --format json {server_spec}'
-    resources_cmd = f'{mcptools_path} resources --format json {server_spec}'
-    prompts_cmd = f'{mcptools_path} prompts --format json {server_spec}'
+async def inspect_remote_server(
+    server_spec: str, timeout: int
+) -> tuple[dict[str, Any], dict[str, Any], dict[str, Any]]:
+    """List a remote MCP server's capabilities via mcptools.
 
-    # Execute commands sequentially for reliability
-    timeout = request.timeout or 30  # Use default if None
+    Args:
+        server_spec: HTTP or SSE URL of the MCP server
+        timeout: Timeout in seconds for each mcptools command
+
+    Returns:
+        Parsed tools, resources and prompts data from mcptools
+
+    Raises:
+        HTTPException: If any mcptools command fails or times out
+    """
+    tools_argv = [_MCPTOOLS_PATH, "tools", "--format", "json", server_spec]
+    resources_argv = [_MCPTOOLS_PATH, "resources", "--format", "json", server_spec]
+    prompts_argv = [_MCPTOOLS_PATH, "prompts", "--format", "json", server_spec]
+
+    # The three listings are independent, so overlap their handshakes and network waits
     try:
-        tools_output = await run_mcptools_command(tools_cmd, timeout)
-        resources_output = await run_mcptools_command(resources_cmd, timeout)
-        prompts_output = await run_mcptools_command(prompts_cmd, timeout)
+        tools_output, resources_output, prompts_output = await asyncio.gather(
+            run_mcptools_command(tools_argv, timeout),
+            run_mcptools_command(resources_argv, timeout),
+            run_mcptools_command(prompts_argv, timeout),
+        )
 
     except HTTPException:
         # Re-raise HTTP exceptions as-is
@@ -249,10 +325,35 @@ async def inspect_mcp_server(request: MCPInspectRequest) -> MCPSnapshot:
             detail=f"Unexpected error during MCP inspection: {e!s}"
         )
 
-    # Parse JSON outputs
-    tools_data = parse_mcptools_json(tools_output)
-    resources_data = parse_mcptools_json(resources_output)
-    prompts_data = parse_mcptools_json(prompts_output)
+    return (
+        parse_mcptools_json(tools_output),
+        parse_mcptools_json(resources_output),
+        parse_mcptools_json(prompts_output),
+    )
+
+
+async def build_snapshot(server_spec: str, transport_type: str, timeout: int) -> MCPSnapshot:
+    """Inspect an MCP server and assemble its capability snapshot.
+
+    Args:
+        server_spec: The server URL or command string
+        transport_type: Transport detected for the server specification
+        timeout: Timeout in seconds for the inspection
+
+    Returns:
+        Complete MCP server snapshot with tools, resources, and prompts
+
+    Raises:
+        HTTPException: For timeouts or server errors
+    """
+    if transport_type == _STDIO:
+        # Local servers are kept running between inspections and queried over one session
+        tools_data, resources_data, prompts_data, protocol_version = await inspect_stdio_server(
+            server_spec, timeout
+        )
+    else:
+        tools_data, resources_data, prompts_data = await inspect_remote_server(server_spec, timeout)
+        protocol_version = "2024-11-05"  # Based on mcptools README
 
     # Convert to Pydantic models
     tools = parse_tools_data(tools_data)
@@ -262,15 +363,82 @@ async def inspect_mcp_server(request: MCPInspectRequest) -> MCPSnapshot:
     # Build server info
     server_info = {
         "connected": True,
-        "protocol_version": "2024-11-05",  # Based on mcptools README
+        "protocol_version": protocol_version,
         "server_spec": server_spec
     }
 
-    # Return complete snapshot
-    return MCPSnapshot(
+    # Every child was validated above, so skip re-validating them through the outer model
+    return MCPSnapshot.model_construct(
         tools=tools,
         resources=resources,
         prompts=prompts,
         server_info=server_info,
         transport_type=transport_type
-    )
\ No newline at end of file
+    )
+
+
+def _forget_inflight(key: tuple[str, str, int], task: "asyncio.Task[MCPSnapshot]") -> None:
+    """Drop a finished inspection, unless a newer one has replaced it."""
+    if _snapshot_inflight.get(key) is task:
+        del _snapshot_inflight[key]
+
+
+@router.post("/inspect", response_model=MCPSnapshot)
+async def inspect_mcp_server(request: MCPInspectRequest, no_cache: bool = False) -> MCPSnapshot:
+    """Inspect an MCP server and return a complete snapshot of its capabilities.
+
+    This endpoint gathers comprehensive information about an MCP server's tools,
+    resources, and prompts. Remote MCP servers (via HTTP/SSE) are queried with
+    mcptools; local MCP setup commands are launched once and kept alive in a
+    session pool so repeated inspections skip the server start-up and handshake.
+
+    Snapshots are cached for a minute per server, and concurrent requests for
+    the same server and timeout share a single inspection. With no_cache, a new
+    inspection is always started rather than joining one already running.
+
+    Args:
+        request: Inspection request containing either a URL or command
+        no_cache: Skip the cached snapshot and inspect the server again
+
+    Returns:
+        Complete MCP server snapshot with tools, resources, and prompts
+
+    Raises:
+        HTTPException: For invalid requests, timeouts, or server errors
+    """
+    # Determine the server specification (URL or command)
+    if request.url:
+        server_spec = request.url
+    elif request.command:
+        server_spec = request.command
+    else:
+        # This should be caught by Pydantic validation, but just in case
+        raise HTTPException(
+            status_code=400,
+            detail="Either 'url' or 'command' must be provided"
+        )
+
+    # Detect transport type
+    transport_type = detect_transport_type(server_spec)
+
+    timeout = request.timeout or 30  # Use default if None
+    cache_key = (server_spec, transport_type)
+
+    if not no_cache:
+        cached = _snapshot_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+    # Only requests with the same timeout share an inspection, so nobody waits on or
+    # fails by another request's timeout; no_cache always starts a fresh inspection
+    inflight_key = (server_spec, transport_type, timeout)
+    task = None if no_cache else _snapshot_inflight.get(inflight_key)
+    if task is None:
+        task = asyncio.create_task(build_snapshot(server_spec, transport_type, timeout))
+        _snapshot_inflight[inflight_key] = task
+        task.add_done_callback(partial(_forget_inflight, inflight_key))
+
+    # Shield so one client disconnecting doesn't cancel the inspection for the others
+    snapshot = await asyncio.shield(task)
+    _snapshot_cache[cache_key] = snapshot
+    return snapshot
@@ -136,9 +136,7 @@ async def delete_page_endpoint(session: SessionDep, page_id: int) -> DeleteRespo
     Removes a page from the database by its ID.
     Authentication and authorization are handled by the API gateway.
     """
-    page = await get_page(session=session, page_id=page_id)
-    if not page:
+    if not await delete_page(session=session, page_id=page_id):
         raise HTTPException(status_code=404, detail="Page not found")
 
-    await delete_page(session=session, page_id=page_id)
     return DeleteResponse(message="Page deleted successfully")
@@ -95,9 +95,15 @@ class Settings(BaseSettings):
     # Claude Code SDK
     ANTHROPIC_API_KEY: str | None = None
 
+    # mcptools binary used to inspect remote (HTTP/SSE) MCP servers
+    MCPTOOLS_PATH: str = "~/go/bin/mcptools"
+
     # Database settings - use DATABASE_URL for external database connection managed by Next.js/Prisma
     # Required in production, but has a placeholder for tests
     DATABASE_URL: str | None = None
+    # Connection pool for PostgreSQL; SQLite keeps SQLAlchemy's defaults
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
 
     @computed_field  # type: ignore[prop-decorator]
     @property
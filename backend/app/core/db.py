@@ -3,6 +3,7 @@
 Provides database engine setup, session management, and initialization utilities.
 """
 
+import orjson
 from sqlalchemy.engine import make_url
 from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
 from sqlmodel.ext.asyncio.session import AsyncSession
@@ -21,9 +22,31 @@ if url.drivername == "postgresql":
 elif url.drivername == "sqlite":
     url = url.set(drivername="sqlite+aiosqlite")
 
+# Hand out the most recently returned connection first, so idle overflow
+# connections age out in quiet periods; stale ones are detected on checkout
+pool_options = (
+    {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_use_lifo": True,
+        "pool_pre_ping": True,
+    }
+    if url.drivername.startswith("postgresql")
+    else {}
+)
+
+
+def _json_serializer(value: object) -> str:
+    """Serialize JSON column values with orjson; the drivers bind text, not bytes."""
+    return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS).decode()
+
+
 engine: AsyncEngine = create_async_engine(
     url,  # Use the SQLAlchemy URL object directly
     future=True,
+    json_serializer=_json_serializer,
+    json_deserializer=orjson.loads,
+    **pool_options,
 )
 
 async_session_maker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
@@ -2,17 +2,23 @@
 
 Provides Create, Read, Update, Delete functionality for database models.
 Follows a functional-first approach with pure functions as specified in the architecture guidelines.
+
+Writes skip ``session.refresh``: sessions are created with ``expire_on_commit=False``
+and primary keys come back through INSERT ... RETURNING, so the objects are already
+fully populated after commit.
 """
 
+from collections.abc import Sequence
 from datetime import datetime
 from typing import Any
-from uuid import uuid4
 
+import uuid_utils
 from pydantic import BaseModel
-from sqlmodel import select
+from sqlalchemy import func, lambda_stmt, update
+from sqlmodel import delete, select
 from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.models import ClaudeSession, Page
+from app.models import ClaudeSession, ClaudeSessionMessage, Page
 
 
 # Pydantic models for Page operations
@@ -56,7 +62,6 @@ async def create_page(*, session: AsyncSession, page_in: PageCreate) -> Page:
     db_page = Page(name=page_in.name)
     session.add(db_page)
     await session.commit()
-    await session.refresh(db_page)
     return db_page
 
 
@@ -73,7 +78,7 @@ async def get_page(*, session: AsyncSession, page_id: int) -> Page | None:
     return await session.get(Page, page_id)
 
 
-async def get_pages(*, session: AsyncSession, skip: int = 0, limit: int = 100) -> list[Page]:
+async def get_pages(*, session: AsyncSession, skip: int = 0, limit: int = 100) -> Sequence[Page]:
     """Get a list of pages with pagination.
 
     Args:
@@ -84,15 +89,14 @@ async def get_pages(*, session: AsyncSession, skip: int = 0, limit: int = 100) -
     Returns:
         List of pages
     """
-    query = select(Page)
-    # Convert Sequence[Page] to list[Page] explicitly for type safety
-    result = await session.exec(query.offset(skip).limit(limit))
-    pages = result.all()
-    return list(pages)
+    # lambda_stmt caches the constructed statement; skip/limit become bound parameters
+    query = lambda_stmt(lambda: select(Page).offset(skip).limit(limit))
+    result = await session.exec(query)  # type: ignore[call-overload]
+    return result.scalars().all()
 
 
 async def update_page(*, session: AsyncSession, db_page: Page, page_in: PageUpdate) -> Page:
-    """Update a page.
+    """Update a page with a single UPDATE ... RETURNING statement.
 
     Args:
         session: Database session
@@ -103,25 +107,28 @@ async def update_page(*, session: AsyncSession, db_page: Page, page_in: PageUpda
         The updated page
     """
     update_data = page_in.model_dump(exclude_unset=True)
-    for key, value in update_data.items():
-        setattr(db_page, key, value)
-    session.add(db_page)
+    if not update_data:
+        return db_page
+    stmt = update(Page).where(Page.id == db_page.id).values(**update_data).returning(Page)  # type: ignore[arg-type]
+    result = await session.exec(stmt)  # type: ignore[call-overload]
+    updated = result.scalar_one()
     await session.commit()
-    await session.refresh(db_page)
-    return db_page
+    return updated  # type: ignore[no-any-return]
 
 
-async def delete_page(*, session: AsyncSession, page_id: int) -> None:
-    """Delete a page.
+async def delete_page(*, session: AsyncSession, page_id: int) -> int:
+    """Delete a page with a single DELETE statement.
 
     Args:
         session: Database session
         page_id: ID of the page to delete
+
+    Returns:
+        Number of rows deleted (0 if the page did not exist)
     """
-    page = await session.get(Page, page_id)
-    if page:
-        await session.delete(page)
-        await session.commit()
+    result = await session.exec(delete(Page).where(Page.id == page_id))  # type: ignore[call-overload]
+    await session.commit()
+    return result.rowcount  # type: ignore[no-any-return]
 
 
 async def create_claude_session(*, session: AsyncSession, session_in: ClaudeSessionCreate) -> ClaudeSession:
@@ -135,14 +142,14 @@ async def create_claude_session(*, session: AsyncSession, session_in: ClaudeSess
         The created Claude session
     """
     db_session = ClaudeSession(
-        id=str(uuid4()),
+        # UUIDv7 is time-ordered, so new rows append to the end of the primary key index
+        id=str(uuid_utils.uuid7()),
         user_id=session_in.user_id,
         session_data=session_in.session_data,
         working_directory=session_in.working_directory,
     )
     session.add(db_session)
     await session.commit()
-    await session.refresh(db_session)
     return db_session
 
 
@@ -159,7 +166,7 @@ async def get_claude_session(*, session: AsyncSession, session_id: str) -> Claud
     return await session.get(ClaudeSession, session_id)
 
 
-async def get_claude_sessions_by_user(*, session: AsyncSession, user_id: str, skip: int = 0, limit: int = 100) -> list[ClaudeSession]:
+async def get_claude_sessions_by_user(*, session: AsyncSession, user_id: str, skip: int = 0, limit: int = 100) -> Sequence[ClaudeSession]:
     """Get Claude sessions for a user with pagination.
 
     Args:
@@ -171,14 +178,15 @@ async def get_claude_sessions_by_user(*, session: AsyncSession, user_id: str, sk
     Returns:
         List of Claude sessions
     """
-    query = select(ClaudeSession).where(ClaudeSession.user_id == user_id)
-    result = await session.exec(query.offset(skip).limit(limit))
-    sessions = result.all()
-    return list(sessions)
+    query = lambda_stmt(
+        lambda: select(ClaudeSession).where(ClaudeSession.user_id == user_id).offset(skip).limit(limit)
+    )
+    result = await session.exec(query)  # type: ignore[call-overload]
+    return result.scalars().all()
 
 
 async def update_claude_session(*, session: AsyncSession, db_session: ClaudeSession, session_in: ClaudeSessionUpdate) -> ClaudeSession:
-    """Update a Claude session.
+    """Update a Claude session with a single UPDATE ... RETURNING statement.
 
     Args:
         session: Database session
@@ -189,24 +197,139 @@ async def update_claude_session(*, session: AsyncSession, db_session: ClaudeSess
         The updated Claude session
     """
     update_data = session_in.model_dump(exclude_unset=True)
-    for key, value in update_data.items():
-        setattr(db_session, key, value)
-    from datetime import timezone
-    db_session.updated_at = datetime.now(timezone.utc)
-    session.add(db_session)
+    stmt = (
+        update(ClaudeSession)
+        .where(ClaudeSession.id == db_session.id)  # type: ignore[arg-type]
+        .values(**update_data, updated_at=datetime.utcnow())
+        .returning(ClaudeSession)
+        .execution_options(populate_existing=True)
+    )
+    result = await session.exec(stmt)  # type: ignore[call-overload]
+    db_session = result.scalar_one()
     await session.commit()
-    await session.refresh(db_session)
     return db_session
 
 
-async def delete_claude_session(*, session: AsyncSession, session_id: str) -> None:
-    """Delete a Claude session.
+async def delete_claude_session(*, session: AsyncSession, session_id: str) -> int:
+    """Delete a Claude session with a single DELETE statement.
 
     Args:
         session: Database session
         session_id: ID of the Claude session to delete
+
+    Returns:
+        Number of rows deleted (0 if the session did not exist)
+    """
+    await session.exec(delete(ClaudeSessionMessage).where(ClaudeSessionMessage.session_id == session_id))  # type: ignore[call-overload]
+    result = await session.exec(delete(ClaudeSession).where(ClaudeSession.id == session_id))  # type: ignore[call-overload]
+    await session.commit()
+    return result.rowcount  # type: ignore[no-any-return]
+
+
+async def add_claude_session_messages(*, session: AsyncSession, session_id: str, messages: Sequence[dict[str, Any]]) -> bool:
+    """Append messages to a Claude session's history and touch its updated_at.
+
+    Only the new messages are written; earlier turns are left untouched. The session
+    row is updated before the next seq is read: that write locks the row (the whole
+    database on SQLite), so concurrent appends to one session take turns instead of
+    picking the same seq, and a missing session is caught before anything is inserted.
+    The first append to a session that still keeps its history in
+    ``session_data["messages"]`` copies that history in ahead of the new messages.
+
+    Args:
+        session: Database session
+        session_id: ID of the Claude session
+        messages: Messages to append, in order; each message's "type" is stored as its role
+
+    Returns:
+        False if the session does not exist, in which case nothing is written
     """
-    claude_session = await session.get(ClaudeSession, session_id)
-    if claude_session:
-        await session.delete(claude_session)
+    if not messages:
+        return True
+    touched = await session.exec(  # type: ignore[call-overload]
+        update(ClaudeSession).where(ClaudeSession.id == session_id).values(updated_at=datetime.utcnow())  # type: ignore[arg-type]
+    )
+    if touched.rowcount == 0:  # type: ignore[attr-defined]
+        # Nothing was changed; committing just ends the transaction and releases the lock
         await session.commit()
+        return False
+    last_seq = (await session.exec(
+        select(func.coalesce(func.max(ClaudeSessionMessage.seq), 0)).where(ClaudeSessionMessage.session_id == session_id)
+    )).one()
+    if last_seq == 0:
+        messages = [*await _legacy_session_messages(session=session, session_id=session_id), *messages]
+    session.add_all([
+        ClaudeSessionMessage(session_id=session_id, seq=last_seq + i, role=message.get("type", "unknown"), content_json=message)
+        for i, message in enumerate(messages, start=1)
+    ])
+    await session.commit()
+    return True
+
+
+async def get_claude_session_messages(*, session: AsyncSession, session_id: str, skip: int = 0, limit: int = 100) -> list[dict[str, Any]]:
+    """Get a page of a Claude session's messages, oldest first.
+
+    Sessions with no ClaudeSessionMessage rows yet are paged from ``session_data["messages"]``.
+
+    Args:
+        session: Database session
+        session_id: ID of the Claude session
+        skip: Number of messages to skip
+        limit: Maximum number of messages to return
+
+    Returns:
+        List of messages
+    """
+    result = await session.exec(
+        select(ClaudeSessionMessage.content_json)
+        .where(ClaudeSessionMessage.session_id == session_id)
+        .order_by(ClaudeSessionMessage.seq)  # type: ignore[arg-type]
+        .offset(skip)
+        .limit(limit)
+    )
+    messages = list(result.all())
+    if not messages and not await _has_session_messages(session=session, session_id=session_id):
+        return (await _legacy_session_messages(session=session, session_id=session_id))[skip:skip + limit]
+    return messages
+
+
+async def get_recent_claude_session_messages(*, session: AsyncSession, session_id: str, limit: int = 10) -> list[dict[str, Any]]:
+    """Get the latest messages of a Claude session, oldest first.
+
+    Sessions with no ClaudeSessionMessage rows yet are read from ``session_data["messages"]``.
+
+    Args:
+        session: Database session
+        session_id: ID of the Claude session
+        limit: Maximum number of messages to return
+
+    Returns:
+        List of up to ``limit`` most recent messages
+    """
+    result = await session.exec(
+        select(ClaudeSessionMessage.content_json)
+        .where(ClaudeSessionMessage.session_id == session_id)
+        .order_by(ClaudeSessionMessage.seq.desc())  # type: ignore[attr-defined]
+        .limit(limit)
+    )
+    messages = list(reversed(result.all()))
+    if not messages and limit > 0:
+        return (await _legacy_session_messages(session=session, session_id=session_id))[-limit:]
+    return messages
+
+
+async def _has_session_messages(*, session: AsyncSession, session_id: str) -> bool:
+    """Whether any messages of a Claude session are stored in ClaudeSessionMessage."""
+    result = await session.exec(
+        select(ClaudeSessionMessage.seq).where(ClaudeSessionMessage.session_id == session_id).limit(1)
+    )
+    return result.first() is not None
+
+
+async def _legacy_session_messages(*, session: AsyncSession, session_id: str) -> list[dict[str, Any]]:
+    """Get the history kept in ``session_data["messages"]`` by sessions from before ClaudeSessionMessage."""
+    session_data = (await session.exec(
+        select(ClaudeSession.session_data).where(ClaudeSession.id == session_id)
+    )).first()
+    messages = (session_data or {}).get("messages")
+    return messages if isinstance(messages, list) else []
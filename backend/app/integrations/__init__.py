@@ -1,13 +1,27 @@
 """Integration utilities for external services."""
 
 from .github import (
+    close_github_clients,
     create_pr_from_changes,
     get_github_client_for_installation,
     get_installation_token,
 )
+from .mcp import (
+    MCPClientSession,
+    MCPRequestError,
+    close_mcp_sessions,
+    discard_mcp_session,
+    get_mcp_session,
+)
 
 __all__ = [
+    "MCPClientSession",
+    "MCPRequestError",
+    "close_github_clients",
+    "close_mcp_sessions",
     "create_pr_from_changes",
+    "discard_mcp_session",
     "get_github_client_for_installation",
     "get_installation_token",
+    "get_mcp_session",
 ]
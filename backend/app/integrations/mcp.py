@@ -0,0 +1,317 @@
+"""MCP (Model Context Protocol) client utilities for server inspection.
+
+Keeps long-lived stdio sessions to local MCP servers so repeated inspections
+reuse one server process and one protocol handshake instead of booting the
+server again for every capability listing.
+"""
+
+import asyncio
+import contextlib
+import shlex
+import time
+from collections import OrderedDict
+from typing import Any
+
+import orjson
+
+from app.core.log_config import logger
+
+PROTOCOL_VERSION = "2024-11-05"
+METHOD_NOT_FOUND = -32601
+
+# Tool listings arrive as a single JSON line and can easily exceed asyncio's 64 KiB default
+_STREAM_LIMIT = 16 * 1024 * 1024
+_SESSION_CACHE_SIZE = 16
+_SESSION_IDLE_TIMEOUT = 300.0
+_SESSION_CLOSE_TIMEOUT = 2.0
+
+
+class MCPRequestError(Exception):
+    """Error response returned by an MCP server for a JSON-RPC request."""
+
+    def __init__(self, code: int, message: str) -> None:
+        super().__init__(f"MCP error {code}: {message}")
+        self.code = code
+        self.message = message
+
+
+class MCPClientSession:
+    """Persistent JSON-RPC session with an MCP server over stdio.
+
+    Messages are newline-delimited JSON. A background reader task routes each
+    response to the request that is waiting on its id, so several requests can
+    be in flight on the same session at once.
+    """
+
+    def __init__(self, argv: list[str]) -> None:
+        self.argv = argv
+        self.protocol_version = PROTOCOL_VERSION
+        self.capabilities: dict[str, Any] = {}
+        self.server_info: dict[str, Any] = {}
+        self.last_used = time.monotonic()
+        self._process: asyncio.subprocess.Process | None = None
+        self._reader: asyncio.Task[None] | None = None
+        self._pending: dict[int, asyncio.Future[dict[str, Any]]] = {}
+        self._next_id = 0
+        self._initialized = False
+        self._closed = False
+        self._start_lock = asyncio.Lock()
+        self._write_lock = asyncio.Lock()
+
+    @property
+    def closed(self) -> bool:
+        """Whether the session has been closed or the server has exited."""
+        return self._closed
+
+    async def start(self) -> None:
+        """Spawn the server and perform the MCP initialize handshake.
+
+        Safe to call concurrently; every caller waits for the same handshake.
+
+        Raises:
+            ConnectionError: If the session was closed or the server exits early
+            MCPRequestError: If the server rejects the initialize request
+        """
+        async with self._start_lock:
+            if self._initialized:
+                return
+            if self._closed:
+                raise ConnectionError("MCP session is closed")
+
+            self._process = await asyncio.create_subprocess_exec(
+                *self.argv,
+                stdin=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.DEVNULL,
+                limit=_STREAM_LIMIT,
+            )
+            self._reader = asyncio.create_task(self._read_loop())
+
+            result = await self.call("initialize", {
+                "protocolVersion": PROTOCOL_VERSION,
+                "capabilities": {},
+                "clientInfo": {"name": "mcp-inspector", "version": "1.0.0"},
+            })
+            self.protocol_version = result.get("protocolVersion", PROTOCOL_VERSION)
+            self.capabilities = result.get("capabilities") or {}
+            self.server_info = result.get("serverInfo") or {}
+            await self._send({"jsonrpc": "2.0", "method": "notifications/initialized"})
+            self._initialized = True
+
+    async def call(self, method: str, params: dict[str, Any] | None = None) -> dict[str, Any]:
+        """Send a JSON-RPC request and wait for its result.
+
+        Args:
+            method: MCP method name, e.g. "tools/list"
+            params: Optional request parameters
+
+        Returns:
+            The "result" member of the response
+
+        Raises:
+            ConnectionError: If the server exits before responding
+            MCPRequestError: If the server returns an error response
+        """
+        self.last_used = time.monotonic()
+        self._next_id += 1
+        request_id = self._next_id
+        future: asyncio.Future[dict[str, Any]] = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+
+        message: dict[str, Any] = {"jsonrpc": "2.0", "id": request_id, "method": method}
+        if params is not None:
+            message["params"] = params
+
+        try:
+            await self._send(message)
+            response = await future
+        finally:
+            self._pending.pop(request_id, None)
+
+        if "error" in response:
+            error = response["error"] or {}
+            raise MCPRequestError(error.get("code", 0), str(error.get("message", "Unknown error")))
+        return response.get("result") or {}
+
+    async def list_capability(self, capability: str) -> dict[str, Any]:
+        """List every item of a capability, following pagination cursors.
+
+        Args:
+            capability: One of "tools", "resources" or "prompts"
+
+        Returns:
+            A dict shaped like mcptools' JSON output, e.g. {"tools": [...]}, or an
+            empty dict when the server does not support the capability
+        """
+        if capability not in self.capabilities:
+            return {}
+
+        items: list[Any] = []
+        params: dict[str, Any] | None = None
+        cursor: Any = True
+        while cursor:
+            try:
+                result = await self.call(f"{capability}/list", params)
+            except MCPRequestError as e:
+                if e.code == METHOD_NOT_FOUND:
+                    return {}
+                raise
+            items.extend(result.get(capability, []))
+            cursor = result.get("nextCursor")
+            params = {"cursor": cursor}
+        return {capability: items}
+
+    async def close(self) -> None:
+        """Terminate the server process and stop the reader task."""
+        self._closed = True
+        process = self._process
+        if process is not None and process.returncode is None:
+            if process.stdin is not None:
+                process.stdin.close()
+            try:
+                await asyncio.wait_for(process.wait(), _SESSION_CLOSE_TIMEOUT)
+            except asyncio.TimeoutError:
+                with contextlib.suppress(ProcessLookupError):
+                    process.kill()
+                await process.wait()
+        if self._reader is not None:
+            self._reader.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._reader
+
+    async def _send(self, message: dict[str, Any]) -> None:
+        """Write one JSON-RPC message to the server's stdin."""
+        if self._process is None or self._process.stdin is None or self._closed:
+            raise ConnectionError("MCP session is closed")
+        data = orjson.dumps(message, option=orjson.OPT_APPEND_NEWLINE)
+        async with self._write_lock:
+            self._process.stdin.write(data)
+            await self._process.stdin.drain()
+
+    async def _read_loop(self) -> None:
+        """Dispatch responses from the server's stdout to waiting requests."""
+        assert self._process is not None and self._process.stdout is not None  # noqa: S101
+        stdout = self._process.stdout
+        try:
+            while line := await stdout.readline():
+                try:
+                    message = orjson.loads(line)
+                except ValueError:
+                    # Some servers print banners or logs to stdout; skip anything that isn't JSON
+                    continue
+                if not isinstance(message, dict) or "method" in message:
+                    # Server-initiated requests and notifications are not needed for inspection
+                    continue
+                future = self._pending.get(message.get("id"))  # type: ignore[arg-type]
+                if future is not None and not future.done():
+                    future.set_result(message)  # type: ignore[arg-type]
+        except ValueError as e:
+            logger.warning(f"MCP server output exceeded the stream limit: {e}")
+        finally:
+            self._closed = True
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(ConnectionError("MCP server closed the connection"))
+
+
+# Live sessions keyed by server_spec, most recently used last
+_mcp_session_cache: "OrderedDict[str, MCPClientSession]" = OrderedDict()
+_mcp_session_lock = asyncio.Lock()
+_evictor_task: asyncio.Task[None] | None = None
+
+
+async def get_mcp_session(server_spec: str) -> MCPClientSession:
+    """Return an initialized session for a stdio server command, reusing a live one.
+
+    Args:
+        server_spec: Command line that launches the MCP server
+
+    Returns:
+        An initialized MCPClientSession
+
+    Raises:
+        ValueError: If the command is empty or cannot be parsed
+        OSError: If the server executable cannot be started
+    """
+    argv = shlex.split(server_spec)
+    if not argv:
+        raise ValueError("MCP server command is empty")
+
+    evicted: list[MCPClientSession] = []
+    async with _mcp_session_lock:
+        session = _mcp_session_cache.get(server_spec)
+        if session is None or session.closed:
+            session = MCPClientSession(argv)
+            _mcp_session_cache[server_spec] = session
+        _mcp_session_cache.move_to_end(server_spec)
+        while len(_mcp_session_cache) > _SESSION_CACHE_SIZE:
+            evicted.append(_mcp_session_cache.popitem(last=False)[1])
+        _ensure_evictor()
+
+    for stale in evicted:
+        await stale.close()
+
+    try:
+        await session.start()
+    except BaseException:
+        await discard_mcp_session(server_spec, session)
+        raise
+    return session
+
+
+async def discard_mcp_session(server_spec: str, session: MCPClientSession | None = None) -> None:
+    """Close and forget the cached session for a server command.
+
+    Args:
+        server_spec: Command line the session was created for
+        session: Only discard if the cached session is this instance
+    """
+    async with _mcp_session_lock:
+        cached = _mcp_session_cache.get(server_spec)
+        if cached is None or (session is not None and cached is not session):
+            cached = None
+        else:
+            del _mcp_session_cache[server_spec]
+    if cached is not None:
+        await cached.close()
+    elif session is not None:
+        await session.close()
+
+
+async def close_mcp_sessions() -> None:
+    """Close every cached session and stop the idle evictor."""
+    global _evictor_task
+
+    async with _mcp_session_lock:
+        sessions = list(_mcp_session_cache.values())
+        _mcp_session_cache.clear()
+        task, _evictor_task = _evictor_task, None
+
+    if task is not None and task.get_loop() is asyncio.get_running_loop():
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
+    for session in sessions:
+        await session.close()
+
+
+def _ensure_evictor() -> None:
+    """Start the idle-session evictor on the running loop if it isn't running."""
+    global _evictor_task
+
+    loop = asyncio.get_running_loop()
+    if _evictor_task is None or _evictor_task.done() or _evictor_task.get_loop() is not loop:
+        _evictor_task = loop.create_task(_evict_idle_sessions())
+
+
+async def _evict_idle_sessions() -> None:
+    """Periodically close sessions that have not been used recently."""
+    while True:
+        await asyncio.sleep(_SESSION_IDLE_TIMEOUT / 2)
+        cutoff = time.monotonic() - _SESSION_IDLE_TIMEOUT
+        async with _mcp_session_lock:
+            idle = [spec for spec, s in _mcp_session_cache.items() if s.last_used < cutoff or s.closed]
+            sessions = [_mcp_session_cache.pop(spec) for spec in idle]
+        for session in sessions:
+            logger.info("Closing idle MCP session")
+            await session.close()
@@ -58,6 +58,11 @@ async def lifespan(_app: FastAPI):
     finally:
         # Shutdown tasks
         logger.info("FastAPI application shutting down")
+        from app.integrations.github import close_github_clients
+        from app.integrations.mcp import close_mcp_sessions
+
+        await close_mcp_sessions()
+        close_github_clients()
     # Cleanup on shutdown is handled in the finally block above
 
 
@@ -1,7 +1,9 @@
 from datetime import datetime
-from typing import Any, Dict, Optional
+from typing import Any
 
-from sqlalchemy import Column, Integer, PrimaryKeyConstraint, Text, TIMESTAMP, JSON
+from sqlalchemy import Column, ForeignKey, Index, Integer, PrimaryKeyConstraint, Text, TIMESTAMP, JSON
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.sql import func
 from sqlmodel import Field, SQLModel
 
 
@@ -11,7 +13,7 @@ class Page(SQLModel, table=True):
         PrimaryKeyConstraint('id', name='Page_pkey'),
     )
 
-    id: Optional[int] = Field(default=None, sa_column=Column('id', Integer, primary_key=True))
+    id: int | None = Field(default=None, sa_column=Column('id', Integer, primary_key=True))
     name: str = Field(sa_column=Column('name', Text))
 
 
@@ -19,16 +21,54 @@ class ClaudeSession(SQLModel, table=True):
     """Model for Claude conversation sessions.
 
     Stores session state for multi-turn conversations with Claude Code SDK.
+    Timestamps are set in UTC by the application: ``created_at`` on insert and
+    ``updated_at`` on insert and every update. The server defaults only cover
+    rows written by other clients to tables created from this model, since the
+    Prisma-owned tables don't have them. On Postgres ``session_data`` is
+    stored as JSONB so key lookups and containment queries can use the GIN index.
     """
 
     __tablename__ = 'ClaudeSession'
     __table_args__ = (
         PrimaryKeyConstraint('id', name='ClaudeSession_pkey'),
+        Index('ClaudeSession_user_id_idx', 'user_id'),
+        Index('ClaudeSession_session_data_gin_idx', 'session_data', postgresql_using='gin'),
     )
 
-    id: Optional[str] = Field(default=None, sa_column=Column('id', Text, primary_key=True))
+    id: str | None = Field(default=None, sa_column=Column('id', Text, primary_key=True))
     user_id: str = Field(sa_column=Column('user_id', Text))
-    session_data: Optional[Dict[str, Any]] = Field(default=None, sa_column=Column('session_data', JSON))
-    working_directory: Optional[str] = Field(default=None, sa_column=Column('working_directory', Text))
-    created_at: datetime = Field(default_factory=datetime.utcnow, sa_column=Column('created_at', TIMESTAMP))
-    updated_at: datetime = Field(default_factory=datetime.utcnow, sa_column=Column('updated_at', TIMESTAMP))
+    session_data: dict[str, Any] | None = Field(default=None, sa_column=Column('session_data', JSON().with_variant(JSONB(), 'postgresql')))
+    working_directory: str | None = Field(default=None, sa_column=Column('working_directory', Text))
+    created_at: datetime = Field(
+        default_factory=datetime.utcnow,
+        sa_column=Column('created_at', TIMESTAMP, server_default=func.now()),
+    )
+    updated_at: datetime = Field(
+        default_factory=datetime.utcnow,
+        sa_column=Column('updated_at', TIMESTAMP, server_default=func.now(), onupdate=datetime.utcnow),
+    )
+
+
+class ClaudeSessionMessage(SQLModel, table=True):
+    """Model for messages of a Claude conversation session.
+
+    Messages are append-only and numbered per session by ``seq``, so each turn
+    inserts just its new messages and recent context is read with an indexed
+    ``ORDER BY seq DESC LIMIT n``.
+    """
+
+    __tablename__ = 'ClaudeSessionMessage'
+    __table_args__ = (
+        PrimaryKeyConstraint('session_id', 'seq', name='ClaudeSessionMessage_pkey'),
+    )
+
+    session_id: str = Field(sa_column=Column(
+        'session_id', Text, ForeignKey('ClaudeSession.id', ondelete='CASCADE'), primary_key=True
+    ))
+    seq: int = Field(sa_column=Column('seq', Integer, primary_key=True, autoincrement=False))
+    role: str = Field(sa_column=Column('role', Text, nullable=False))
+    content_json: dict[str, Any] = Field(sa_column=Column('content_json', JSON().with_variant(JSONB(), 'postgresql'), nullable=False))
+    created_at: datetime | None = Field(
+        default=None,
+        sa_column=Column('created_at', TIMESTAMP, server_default=func.now(), nullable=False),
+    )
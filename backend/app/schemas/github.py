@@ -1,12 +1,21 @@
 """Pydantic models for GitHub API request/response validation."""
 
-from pydantic import BaseModel, Field
+from typing import Annotated
+
+from pydantic import BaseModel, ConfigDict, Field, StringConstraints
+
+_MODEL_CONFIG = ConfigDict(frozen=True, extra="forbid", populate_by_name=True)
+
+# Paths are stripped of stray whitespace; Markdown bodies are kept exactly as sent
+_StrippedStr = Annotated[str, StringConstraints(strip_whitespace=True)]
 
 
 class CreatePRRequest(BaseModel):
     """Request model for creating a GitHub pull request."""
 
-    working_directory: str = Field(
+    model_config = _MODEL_CONFIG
+
+    working_directory: _StrippedStr = Field(
         ...,
         description="Local directory path containing the git repository with changes to commit and push"
     )
@@ -19,6 +28,8 @@ class CreatePRRequest(BaseModel):
 class CreatePRResponse(BaseModel):
     """Response model for pull request creation."""
 
+    model_config = _MODEL_CONFIG
+
     pr_url: str = Field(
         ...,
         description="URL of the created GitHub pull request"
@@ -5,12 +5,20 @@ This module defines the data models for MCP server inspection and snapshot respo
 
 from typing import Any
 
-from pydantic import BaseModel, Field, model_validator
+from pydantic import BaseModel, ConfigDict, Field, model_validator
+
+# Snapshots are cached and shared between requests, so every model is immutable.
+# Server listings routinely carry fields we don't model (annotations, outputSchema,
+# ...), so those are ignored rather than rejected.
+_LISTING_CONFIG = ConfigDict(frozen=True, populate_by_name=True, str_strip_whitespace=True)
+_INTERNAL_CONFIG = ConfigDict(frozen=True, extra="forbid", populate_by_name=True, str_strip_whitespace=True)
 
 
 class MCPToolSchema(BaseModel):
     """Schema definition for an MCP tool."""
 
+    model_config = _LISTING_CONFIG
+
     name: str
     description: str | None = None
     input_schema: dict[str, Any] = Field(alias="inputSchema")  # JSON Schema for tool parameters
@@ -19,6 +27,8 @@ class MCPToolSchema(BaseModel):
 class MCPResourceSchema(BaseModel):
     """Schema definition for an MCP resource."""
 
+    model_config = _LISTING_CONFIG
+
     uri: str
     name: str
     description: str | None = None
@@ -28,6 +38,8 @@ class MCPResourceSchema(BaseModel):
 class MCPPromptSchema(BaseModel):
     """Schema definition for an MCP prompt."""
 
+    model_config = _LISTING_CONFIG
+
     name: str
     description: str | None = None
     arguments: list[dict[str, Any]] | None = None
@@ -36,6 +48,8 @@ class MCPPromptSchema(BaseModel):
 class MCPSnapshot(BaseModel):
     """Complete snapshot of MCP server capabilities."""
 
+    model_config = _INTERNAL_CONFIG
+
     tools: list[MCPToolSchema]
     resources: list[MCPResourceSchema]
     prompts: list[MCPPromptSchema]
@@ -46,6 +60,8 @@ class MCPSnapshot(BaseModel):
 class MCPInspectRequest(BaseModel):
     """Request model for MCP inspection."""
 
+    model_config = _INTERNAL_CONFIG
+
     url: str | None = None  # For remote MCP servers
     command: str | None = None  # For local MCP setup commands
     timeout: int | None = 30  # Timeout in seconds
@@ -0,0 +1,22 @@
+"""Pydantic models for vulnerability tracking."""
+
+from typing import Annotated, Any, Literal
+
+from pydantic import BaseModel, BeforeValidator, ConfigDict
+
+Severity = Literal["critical", "high", "medium", "low"]
+
+
+def _normalize_severity(value: Any) -> Any:
+    """Accept severity levels in any case."""
+    return value.strip().lower() if isinstance(value, str) else value
+
+
+class Vulnerability(BaseModel):
+    """A single vulnerability recorded during a security review."""
+
+    model_config = ConfigDict(frozen=True, extra="forbid", str_strip_whitespace=True)
+
+    name: str
+    cause: str
+    type: Annotated[Severity, BeforeValidator(_normalize_severity)]
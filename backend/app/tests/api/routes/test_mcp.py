@@ -0,0 +1,207 @@
+"""Integration tests for the MCP inspection API routes.
+
+Local (stdio) inspections run against a small fake MCP server so the tests
+exercise the real session pool without requiring mcptools or network access.
+"""
+
+import asyncio
+import json
+import shlex
+import sys
+from collections.abc import AsyncGenerator
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+from fastapi import HTTPException
+from httpx import AsyncClient
+from pytest_asyncio import fixture  # pyright: ignore[reportUnknownVariableType]
+
+from app.api.routes.mcp import (
+    _snapshot_cache,  # pyright: ignore[reportPrivateUsage]
+    parse_tools_data,
+    run_mcptools_command,
+)
+from app.core.config import settings
+from app.integrations.mcp import close_mcp_sessions
+
+FAKE_SERVER = Path(__file__).resolve().parents[2] / "utils" / "mcp_server.py"
+FAKE_SERVER_COMMAND = shlex.join([sys.executable, str(FAKE_SERVER)])
+
+
+@fixture(autouse=True)  # pyright: ignore[reportUntypedFunctionDecorator]
+async def mcp_sessions() -> AsyncGenerator[None, None]:
+    """Reset cached snapshots and close pooled MCP sessions after each test."""
+    yield
+    _snapshot_cache.clear()
+    await close_mcp_sessions()
+
+
+@pytest.mark.asyncio
+async def test_inspect_stdio_server(client: AsyncClient) -> None:
+    """Test inspecting a local MCP server returns its full snapshot."""
+    response = await client.post(
+        f"{settings.API_V1_STR}/mcp/inspect",
+        json={"command": FAKE_SERVER_COMMAND},
+    )
+
+    assert response.status_code == 200
+    content = response.json()
+    assert content["transport_type"] == "stdio"
+    assert [tool["name"] for tool in content["tools"]] == ["whoami", "echo"]
+    assert content["resources"][0]["uri"] == "file:///readme.md"
+    assert content["prompts"][0]["name"] == "greet"
+    assert content["server_info"]["protocol_version"] == "2024-11-05"
+
+
+@pytest.mark.asyncio
+async def test_inspect_stdio_server_reuses_process(client: AsyncClient) -> None:
+    """Test repeated inspections of the same command share one server process."""
+    pids: list[str] = []
+    for _ in range(2):
+        response = await client.post(
+            f"{settings.API_V1_STR}/mcp/inspect",
+            params={"no_cache": True},
+            json={"command": FAKE_SERVER_COMMAND},
+        )
+        assert response.status_code == 200
+        pids.append(response.json()["tools"][0]["description"])
+
+    assert pids[0] == pids[1]
+
+
+@pytest.mark.asyncio
+async def test_inspect_stdio_server_missing_capability(client: AsyncClient) -> None:
+    """Test capabilities the server doesn't declare come back empty."""
+    response = await client.post(
+        f"{settings.API_V1_STR}/mcp/inspect",
+        json={"command": f"{FAKE_SERVER_COMMAND} --no-prompts"},
+    )
+
+    assert response.status_code == 200
+    content = response.json()
+    assert content["prompts"] == []
+    assert len(content["tools"]) == 2
+
+
+@pytest.mark.asyncio
+async def test_inspect_stdio_server_not_found(client: AsyncClient) -> None:
+    """Test a command that cannot be executed returns 502."""
+    response = await client.post(
+        f"{settings.API_V1_STR}/mcp/inspect",
+        json={"command": "/nonexistent/mcp-server --stdio"},
+    )
+
+    assert response.status_code == 502
+    assert "MCP server request failed" in response.json()["detail"]
+
+
+@pytest.mark.asyncio
+async def test_inspect_remote_server_runs_listings_concurrently(client: AsyncClient) -> None:
+    """Test the three mcptools listings for a remote server overlap."""
+    started: list[str] = []
+    all_started = asyncio.Event()
+    outputs = {
+        "tools": {"tools": [{"name": "search", "inputSchema": {}}]},
+        "resources": {"resources": []},
+        "prompts": {"prompts": []},
+    }
+
+    async def fake_run_mcptools_command(argv: list[str], timeout: int = 30) -> bytes:  # noqa: ARG001
+        capability = argv[1]
+        assert argv[-1] == "https://example.com/mcp"
+        started.append(capability)
+        if len(started) == 3:
+            all_started.set()
+        # Sequential execution would never get past the first wait
+        await asyncio.wait_for(all_started.wait(), timeout=1)
+        return json.dumps(outputs[capability]).encode()
+
+    with patch("app.api.routes.mcp.run_mcptools_command", fake_run_mcptools_command):
+        response = await client.post(
+            f"{settings.API_V1_STR}/mcp/inspect",
+            json={"url": "https://example.com/mcp"},
+        )
+
+    assert response.status_code == 200
+    content = response.json()
+    assert content["transport_type"] == "http"
+    assert content["tools"][0]["name"] == "search"
+    assert sorted(started) == ["prompts", "resources", "tools"]
+
+
+@pytest.mark.asyncio
+async def test_inspect_caches_snapshot(client: AsyncClient) -> None:
+    """Test repeated inspections are served from the snapshot cache."""
+    calls: list[str] = []
+
+    async def fake_run_mcptools_command(argv: list[str], timeout: int = 30) -> bytes:  # noqa: ARG001
+        calls.append(argv[1])
+        return json.dumps({argv[1]: []}).encode()
+
+    with patch("app.api.routes.mcp.run_mcptools_command", fake_run_mcptools_command):
+        for _ in range(2):
+            response = await client.post(
+                f"{settings.API_V1_STR}/mcp/inspect",
+                json={"url": "https://example.com/sse"},
+            )
+            assert response.status_code == 200
+        assert len(calls) == 3
+
+        response = await client.post(
+            f"{settings.API_V1_STR}/mcp/inspect",
+            params={"no_cache": True},
+            json={"url": "https://example.com/sse"},
+        )
+        assert response.status_code == 200
+        assert len(calls) == 6
+
+
+@pytest.mark.asyncio
+async def test_run_mcptools_command_without_mcptools() -> None:
+    """Test a missing mcptools binary fails fast with 503."""
+    with patch("app.api.routes.mcp._MCPTOOLS_AVAILABLE", False), pytest.raises(HTTPException) as exc_info:
+        await run_mcptools_command(["mcptools", "tools", "https://example.com/mcp"])
+
+    assert exc_info.value.status_code == 503
+
+
+def test_parse_tools_data_skips_invalid_entries() -> None:
+    """Test a malformed tool is dropped without losing the valid ones."""
+    tools = parse_tools_data({
+        "tools": [
+            {"name": "search", "inputSchema": {}},
+            {"description": "missing name and schema"},
+            {"name": "fetch", "inputSchema": {"type": "object"}},
+        ]
+    })
+
+    assert [tool.name for tool in tools] == ["search", "fetch"]
+
+
+@pytest.mark.asyncio
+async def test_inspect_shares_inflight_only_with_same_timeout(client: AsyncClient) -> None:
+    """Test concurrent inspections join only when their timeouts match."""
+    calls: list[int] = []
+    release = asyncio.Event()
+
+    async def fake_run_mcptools_command(argv: list[str], timeout: int = 30) -> bytes:
+        calls.append(timeout)
+        await release.wait()
+        return json.dumps({argv[1]: []}).encode()
+
+    async def inspect(timeout: int) -> int:
+        response = await client.post(
+            f"{settings.API_V1_STR}/mcp/inspect",
+            json={"url": "https://example.com/mcp", "timeout": timeout},
+        )
+        return response.status_code
+
+    with patch("app.api.routes.mcp.run_mcptools_command", fake_run_mcptools_command):
+        requests = asyncio.gather(inspect(10), inspect(10), inspect(20))
+        await asyncio.sleep(0.05)
+        release.set()
+        assert await requests == [200, 200, 200]
+
+    # One run of three listings per distinct timeout
+    assert sorted(calls) == [10, 10, 10, 20, 20, 20]
@@ -0,0 +1,198 @@
+"""Tests for Claude session CRUD operations."""
+
+import asyncio
+import uuid
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
+import pytest
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.db import async_session_maker
+from app.crud import (
+    ClaudeSessionCreate,
+    ClaudeSessionUpdate,
+    add_claude_session_messages,
+    create_claude_session,
+    delete_claude_session,
+    get_claude_session,
+    get_claude_session_messages,
+    get_claude_sessions_by_user,
+    get_recent_claude_session_messages,
+    update_claude_session,
+)
+from app.tests.utils.utils import random_lower_string
+
+
+@asynccontextmanager
+async def _own_session() -> AsyncIterator[AsyncSession]:
+    """Open a session on its own connection, outside the db fixture's rolled-back transaction."""
+    session = async_session_maker()
+    try:
+        yield session
+    finally:
+        await session.close()
+
+
+@pytest.mark.asyncio
+async def test_get_claude_sessions_by_user(db: AsyncSession) -> None:
+    """Test listing sessions filters by user and paginates."""
+    alice, bob = random_lower_string(), random_lower_string()
+    for user_id in (alice, alice, alice, bob):
+        await create_claude_session(session=db, session_in=ClaudeSessionCreate(user_id=user_id))
+
+    sessions = await get_claude_sessions_by_user(session=db, user_id=alice)
+    assert len(sessions) == 3
+    assert all(s.user_id == alice for s in sessions)
+
+    page = await get_claude_sessions_by_user(session=db, user_id=alice, skip=1, limit=1)
+    assert len(page) == 1
+    assert page[0].id == sessions[1].id
+
+
+@pytest.mark.asyncio
+async def test_create_claude_session_is_populated(db: AsyncSession) -> None:
+    """Test a created session is fully populated without a refresh."""
+    created = await create_claude_session(
+        session=db,
+        session_in=ClaudeSessionCreate(user_id="carol", working_directory="/srv/project"),
+    )
+
+    assert created.id
+    assert created.user_id == "carol"
+    assert created.working_directory == "/srv/project"
+    assert created.created_at is not None
+    assert created.updated_at is not None
+
+
+@pytest.mark.asyncio
+async def test_delete_claude_session(db: AsyncSession) -> None:
+    """Test deleting reports whether a row was removed."""
+    created = await create_claude_session(
+        session=db, session_in=ClaudeSessionCreate(user_id=random_lower_string())
+    )
+    assert created.id is not None
+    session_id = created.id
+
+    assert await delete_claude_session(session=db, session_id=session_id) == 1
+    assert await get_claude_session(session=db, session_id=session_id) is None
+    assert await delete_claude_session(session=db, session_id=session_id) == 0
+
+
+@pytest.mark.asyncio
+async def test_claude_session_ids_are_time_ordered(db: AsyncSession) -> None:
+    """Test session ids are UUIDv7 and sort in creation order."""
+    user_id = random_lower_string()
+    created = [
+        await create_claude_session(session=db, session_in=ClaudeSessionCreate(user_id=user_id))
+        for _ in range(3)
+    ]
+
+    assert all(uuid.UUID(s.id).version == 7 for s in created)
+    assert [s.id for s in created] == sorted(s.id for s in created)
+
+
+@pytest.mark.asyncio
+async def test_update_claude_session(db: AsyncSession) -> None:
+    """Test an update is persisted and returned in one statement."""
+    created = await create_claude_session(
+        session=db, session_in=ClaudeSessionCreate(user_id=random_lower_string())
+    )
+
+    updated = await update_claude_session(
+        session=db,
+        db_session=created,
+        session_in=ClaudeSessionUpdate(session_data={"messages": [{"type": "user"}]}),
+    )
+
+    assert updated.id is not None
+    assert updated.id == created.id
+    assert updated.session_data == {"messages": [{"type": "user"}]}
+    fetched = await get_claude_session(session=db, session_id=updated.id)
+    assert fetched is not None
+    assert fetched.session_data == {"messages": [{"type": "user"}]}
+
+
+@pytest.mark.asyncio
+async def test_claude_session_messages_append(db: AsyncSession) -> None:
+    """Test each turn appends its messages and recent history reads the tail."""
+    created = await create_claude_session(
+        session=db, session_in=ClaudeSessionCreate(user_id=random_lower_string())
+    )
+    assert created.id is not None
+    session_id = created.id
+    first_turn = [{"type": "user", "n": 1}, {"type": "assistant", "n": 2}]
+    second_turn = [{"type": "user", "n": 3}, {"type": "assistant", "n": 4}, {"type": "result", "n": 5}]
+
+    await add_claude_session_messages(session=db, session_id=session_id, messages=first_turn)
+    await add_claude_session_messages(session=db, session_id=session_id, messages=second_turn)
+
+    history = await get_claude_session_messages(session=db, session_id=session_id)
+    assert [m["n"] for m in history] == [1, 2, 3, 4, 5]
+    page = await get_claude_session_messages(session=db, session_id=session_id, skip=1, limit=2)
+    assert [m["n"] for m in page] == [2, 3]
+    recent = await get_recent_claude_session_messages(session=db, session_id=session_id, limit=3)
+    assert [m["n"] for m in recent] == [3, 4, 5]
+
+    assert await delete_claude_session(session=db, session_id=session_id) == 1
+    assert await get_claude_session_messages(session=db, session_id=session_id) == []
+
+
+@pytest.mark.asyncio
+async def test_claude_session_messages_legacy_history(db: AsyncSession) -> None:
+    """Test history kept in session_data is replayed and carried over on the first append."""
+    legacy = [{"type": "user", "n": 1}, {"type": "assistant", "n": 2}, {"type": "user", "n": 3}]
+    created = await create_claude_session(
+        session=db,
+        session_in=ClaudeSessionCreate(user_id=random_lower_string(), session_data={"messages": legacy}),
+    )
+    assert created.id is not None
+    session_id = created.id
+
+    recent = await get_recent_claude_session_messages(session=db, session_id=session_id, limit=2)
+    assert [m["n"] for m in recent] == [2, 3]
+    page = await get_claude_session_messages(session=db, session_id=session_id, skip=1, limit=1)
+    assert [m["n"] for m in page] == [2]
+
+    await add_claude_session_messages(session=db, session_id=session_id, messages=[{"type": "assistant", "n": 4}])
+    history = await get_claude_session_messages(session=db, session_id=session_id)
+    assert [m["n"] for m in history] == [1, 2, 3, 4]
+
+
+@pytest.mark.asyncio
+async def test_claude_session_messages_unknown_session(db: AsyncSession) -> None:
+    """Test appending to a missing session writes nothing."""
+    session_id = str(uuid.uuid4())
+
+    assert not await add_claude_session_messages(session=db, session_id=session_id, messages=[{"type": "user"}])
+    assert await get_claude_session_messages(session=db, session_id=session_id) == []
+
+
+@pytest.mark.asyncio
+async def test_claude_session_messages_concurrent_appends() -> None:
+    """Test two turns appended at once on separate connections both keep their messages."""
+    async with _own_session() as setup:
+        created = await create_claude_session(
+            session=setup, session_in=ClaudeSessionCreate(user_id=random_lower_string())
+        )
+    assert created.id is not None
+    session_id = created.id
+
+    async def append_turn(turn: int) -> bool:
+        async with _own_session() as turn_session:
+            return await add_claude_session_messages(
+                session=turn_session,
+                session_id=session_id,
+                messages=[{"type": "user", "turn": turn}, {"type": "assistant", "turn": turn}],
+            )
+
+    try:
+        assert await asyncio.gather(append_turn(1), append_turn(2)) == [True, True]
+        async with _own_session() as check:
+            history = await get_claude_session_messages(session=check, session_id=session_id)
+        # Each turn's messages stay together, whichever turn went first
+        assert sorted(m["turn"] for m in history) == [1, 1, 2, 2]
+        assert history[0]["turn"] == history[1]["turn"]
+    finally:
+        async with _own_session() as cleanup:
+            await delete_claude_session(session=cleanup, session_id=session_id)
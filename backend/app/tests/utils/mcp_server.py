@@ -0,0 +1,60 @@
+"""Minimal stdio MCP server used by the MCP inspection tests.
+
+Speaks just enough newline-delimited JSON-RPC to answer the initialize
+handshake and the tools/resources/prompts listings. The process id is
+reported as the description of the "whoami" tool so tests can tell whether
+a server process was reused. Pass --no-prompts to omit the prompts capability.
+"""
+
+import json
+import os
+import sys
+from typing import Any
+
+TOOLS = [
+    {"name": "whoami", "description": str(os.getpid()), "inputSchema": {"type": "object"}},
+    {"name": "echo", "description": "Echo a message", "inputSchema": {"type": "object"}},
+]
+RESOURCES = [
+    {"uri": "file:///readme.md", "name": "readme", "mimeType": "text/markdown"},
+]
+PROMPTS = [
+    {"name": "greet", "description": "Greet someone", "arguments": [{"name": "who"}]},
+]
+
+
+def main() -> None:
+    """Serve JSON-RPC requests read from stdin until it is closed."""
+    capabilities = {"tools": {}, "resources": {}}
+    if "--no-prompts" not in sys.argv:
+        capabilities["prompts"] = {}
+
+    results = {
+        "tools/list": {"tools": TOOLS},
+        "resources/list": {"resources": RESOURCES},
+        "prompts/list": {"prompts": PROMPTS},
+    }
+
+    for line in sys.stdin:
+        message = json.loads(line)
+        if "id" not in message:
+            continue  # notification
+        method = message["method"]
+        response: dict[str, Any]
+        if method == "initialize":
+            response = {"result": {
+                "protocolVersion": "2024-11-05",
+                "capabilities": capabilities,
+                "serverInfo": {"name": "fake", "version": "0.0.1"},
+            }}
+        elif method in results and method.split("/")[0] in capabilities:
+            response = {"result": results[method]}
+        else:
+            response = {"error": {"code": -32601, "message": "Method not found"}}
+        response.update({"jsonrpc": "2.0", "id": message["id"]})
+        sys.stdout.write(json.dumps(response) + "\n")
+        sys.stdout.flush()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Tests for streaming Claude responses as NDJSON."""
+
+import asyncio
+from collections.abc import AsyncIterator
+from typing import Any
+from unittest.mock import AsyncMock, patch
+
+import orjson
+import pytest
+
+from app import utils
+
+
+class FakeClaudeClient:
+    """Stand-in for ClaudeSDKClient that replays a fixed list of messages."""
+
+    def __init__(self, messages: list[Any]) -> None:
+        self.messages = messages
+
+    async def __aenter__(self) -> "FakeClaudeClient":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        return None
+
+    async def query(self, _prompt: str) -> None:
+        return None
+
+    async def receive_response(self) -> AsyncIterator[Any]:
+        for message in self.messages:
+            yield message
+
+
+@pytest.mark.asyncio
+async def test_stream_coalesces_queued_messages() -> None:
+    """Test a burst of messages is written in a few chunks without losing lines."""
+    async def fake_create_claude_client(*args: Any) -> FakeClaudeClient:  # noqa: ARG001
+        return FakeClaudeClient(list(range(100)))
+
+    with patch.object(utils, "create_claude_client", fake_create_claude_client), \
+         patch.object(utils, "_convert_sdk_message_to_dict", lambda message: {"n": message}):
+        chunks = [chunk async for chunk in utils.query_claude_stream("hello")]
+
+    lines = b"".join(chunks).splitlines()
+    assert [orjson.loads(line)["n"] for line in lines] == list(range(100))
+    assert len(chunks) < 100
+    assert all(chunk.endswith(b"\n") for chunk in chunks)
+
+
+@pytest.mark.asyncio
+async def test_stream_rolls_back_failed_history_write() -> None:
+    """Test a failed history write still ends the stream and rolls the session back."""
+    async def fake_create_claude_client(*args: Any) -> FakeClaudeClient:  # noqa: ARG001
+        return FakeClaudeClient([{"type": "assistant", "content": []}])
+
+    db_session = AsyncMock()
+    with patch.object(utils, "create_claude_client", fake_create_claude_client), \
+         patch.object(utils, "_convert_sdk_message_to_dict", lambda message: message), \
+         patch("app.crud.get_recent_claude_session_messages", AsyncMock(return_value=[])), \
+         patch("app.crud.add_claude_session_messages", AsyncMock(side_effect=RuntimeError("db down"))):
+        chunks = [chunk async for chunk in utils.query_claude_stream("hello", None, "session-id", db_session)]
+
+    assert orjson.loads(b"".join(chunks))["type"] == "assistant"
+    db_session.rollback.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_stream_closed_midway_stops_producer() -> None:
+    """Test closing the stream while the queue is full stops the producer promptly."""
+    async def fake_create_claude_client(*args: Any) -> FakeClaudeClient:  # noqa: ARG001
+        return FakeClaudeClient(list(range(1000)))
+
+    with patch.object(utils, "create_claude_client", fake_create_claude_client), \
+         patch.object(utils, "_convert_sdk_message_to_dict", lambda message: {"n": message}):
+        stream = utils.query_claude_stream("hello")
+        assert await stream.__anext__()
+        # Let the producer fill the queue and park on put()
+        await asyncio.sleep(0.01)
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        await asyncio.wait_for(stream.aclose(), timeout=1)
+        # A close stuck behind the producer would only end at the wait_for timeout
+        assert loop.time() - started < 0.5
+
+    assert [task for task in asyncio.all_tasks() if task is not asyncio.current_task()] == []
@@ -1,6 +1,27 @@
 """Tests for GitHub App authentication and PR creation utilities."""
 
+import base64
+import subprocess
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import jwt
+import pygit2
 import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+from app.api.routes.github import (
+    _GH_URL_RE,  # pyright: ignore[reportPrivateUsage]
+    _read_origin_url,  # pyright: ignore[reportPrivateUsage]
+)
+from app.integrations import github as github_integration
+
+
+def _git(*args: str, cwd: Path) -> None:
+    """Run a git command in the given directory."""
+    subprocess.run(["git", *args], cwd=cwd, check=True, capture_output=True)  # noqa: S603, S607
 
 
 class TestGitHubAuth:
@@ -8,4 +29,278 @@ class TestGitHubAuth:
 
     def test_placeholder(self):
         """Placeholder test to ensure test file is valid."""
-        assert True
\ No newline at end of file
+        assert True
+
+
+class TestGetInstallationToken:
+    """Test installation token caching."""
+
+    @pytest.fixture
+    def private_key_b64(self) -> str:
+        """A freshly generated RSA key, base64 encoded like the app setting."""
+        key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        pem = key.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption(),
+        )
+        return base64.b64encode(pem).decode()
+
+    @pytest.fixture
+    def integration(self):
+        """Patch GithubIntegration and clear cached clients around each test."""
+        github_integration.close_github_clients()
+        with patch.object(github_integration, "GithubIntegration") as integration_cls:
+            yield integration_cls.return_value
+        github_integration.close_github_clients()
+
+    def _token(self, value: str, expires_in: timedelta) -> MagicMock:
+        return MagicMock(token=value, expires_at=datetime.now(timezone.utc) + expires_in)
+
+    def test_reuses_cached_token(self, integration: MagicMock, private_key_b64: str):
+        """A second request for the same repo does not hit the GitHub API."""
+        integration.get_access_token.return_value = self._token("tok-1", timedelta(hours=1))
+
+        first = github_integration.get_installation_token(1, private_key_b64, "octo/repo")
+        second = github_integration.get_installation_token(1, private_key_b64, "octo/repo")
+
+        assert first == second == "tok-1"
+        assert integration.get_access_token.call_count == 1
+
+    def test_shares_token_across_owner_repos(self, integration: MagicMock, private_key_b64: str):
+        """Repositories of the same owner reuse one installation token."""
+        integration.get_access_token.side_effect = [
+            self._token("tok-octo", timedelta(hours=1)),
+            self._token("tok-other", timedelta(hours=1)),
+        ]
+
+        assert github_integration.get_installation_token(1, private_key_b64, "octo/repo") == "tok-octo"
+        assert github_integration.get_installation_token(1, private_key_b64, "octo/docs") == "tok-octo"
+        assert github_integration.get_installation_token(1, private_key_b64, "other/repo") == "tok-other"
+
+    def test_refreshes_token_close_to_expiry(self, integration: MagicMock, private_key_b64: str):
+        """A token about to expire is replaced by a new one."""
+        integration.get_access_token.side_effect = [
+            self._token("tok-1", timedelta(minutes=8)),
+            self._token("tok-2", timedelta(hours=1)),
+        ]
+
+        assert github_integration.get_installation_token(1, private_key_b64, "octo/repo") == "tok-1"
+        assert github_integration.get_installation_token(1, private_key_b64, "octo/repo") == "tok-2"
+
+    def test_signs_app_jwt_with_private_key(self, integration: MagicMock, private_key_b64: str):
+        """The app JWT is signed with the configured key."""
+        integration.get_access_token.return_value = self._token("tok-1", timedelta(hours=1))
+        with patch.object(
+            github_integration.Auth, "AppAuth", wraps=github_integration.Auth.AppAuth
+        ) as app_auth:
+            github_integration.get_installation_token(2, private_key_b64, "octo/other")
+
+        sign = app_auth.call_args.kwargs["sign_func"]
+        token = sign({"iss": "2"})
+        pem = base64.b64decode(private_key_b64).decode()
+        public_key = github_integration._load_private_key(pem).public_key()  # pyright: ignore[reportPrivateUsage]
+        assert jwt.decode(token, public_key, algorithms=["RS256"])["iss"] == 2  # type: ignore[arg-type]
+        # The signature is reused while the JWT is still valid
+        assert sign({"iss": "2"}) == token
+
+
+class TestGetGithubClient:
+    """Test sharing GitHub clients between requests."""
+
+    def test_reuses_client_per_token(self):
+        """The same token yields the same client until clients are closed."""
+        github_integration.close_github_clients()
+        client = github_integration.get_github_client_for_installation("tok-1")
+
+        assert github_integration.get_github_client_for_installation("tok-1") is client
+        assert github_integration.get_github_client_for_installation("tok-2") is not client
+
+        github_integration.close_github_clients()
+        assert github_integration.get_github_client_for_installation("tok-1") is not client
+        github_integration.close_github_clients()
+
+
+class TestCreatePrFromChanges:
+    """Test committing, pushing and opening PRs from a local repository."""
+
+    @pytest.mark.asyncio
+    async def test_rejects_default_branch(self, tmp_path: Path):
+        """PRs cannot be opened from main."""
+        _git("init", "-q", "-b", "main", cwd=tmp_path)
+
+        with pytest.raises(ValueError, match="main/master"):
+            await github_integration.create_pr_from_changes(
+                str(tmp_path), "body", MagicMock(), "octo/repo", "token"
+            )
+
+    @pytest.mark.asyncio
+    async def test_commits_changes_and_pushes_branch(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+        """Pending changes are committed as the bot and the branch is pushed."""
+        monkeypatch.setattr(github_integration, "_AUTHOR_NAME", "Test Bot")
+        _git("init", "-q", "-b", "fix/deps", cwd=tmp_path)
+        (tmp_path / "src" / "pkg").mkdir(parents=True)
+        (tmp_path / "src" / "pkg" / "app.py").write_text("print('patched')\n")
+        github_client = MagicMock()
+        github_client.get_repo.return_value.create_pull.return_value.html_url = "https://github.com/octo/repo/pull/1"
+
+        with patch.object(pygit2.remotes.Remote, "push") as push:
+            pr_url = await github_integration.create_pr_from_changes(
+                str(tmp_path), "Bump deps", github_client, "octo/repo", "token"
+            )
+
+        assert pr_url == "https://github.com/octo/repo/pull/1"
+        push.assert_called_once()
+        assert push.call_args.args[0] == ["refs/heads/fix/deps:refs/heads/fix/deps"]
+        head = pygit2.Repository(str(tmp_path)).head.peel(pygit2.Commit)
+        assert head.author.name == "Test Bot"
+        assert head.message == "Security fixes\n\nBump deps"
+        assert "src/pkg/app.py" in {entry.path for entry in pygit2.Repository(str(tmp_path)).index}
+        github_client.get_repo.return_value.create_pull.assert_called_once_with(
+            title="Security fixes - fix/deps", body="Bump deps", head="fix/deps", base="main"
+        )
+
+    @pytest.mark.asyncio
+    async def test_clean_tree_is_pushed_without_new_commit(self, tmp_path: Path):
+        """Without local changes the existing branch head is pushed as is."""
+        _git("init", "-q", "-b", "fix/clean", cwd=tmp_path)
+        (tmp_path / "app.py").write_text("print('hello')\n")
+        (tmp_path / ".gitignore").write_text("*.log\n")
+        _git("add", ".", cwd=tmp_path)
+        _git("-c", "user.name=dev", "-c", "user.email=dev@example.com", "commit", "-qm", "init", cwd=tmp_path)
+        (tmp_path / "debug.log").write_text("ignored\n")
+        head = pygit2.Repository(str(tmp_path)).head.target
+
+        with patch.object(pygit2.remotes.Remote, "push") as push:
+            await github_integration.create_pr_from_changes(
+                str(tmp_path), "body", MagicMock(), "octo/repo", "token"
+            )
+
+        push.assert_called_once()
+        assert pygit2.Repository(str(tmp_path)).head.target == head
+
+    @pytest.mark.asyncio
+    async def test_small_change_is_pushed_through_git_data_api(self, tmp_path: Path):
+        """A one-commit change on top of origin/main is recreated with the API, not pushed."""
+        _git("init", "-q", "-b", "main", cwd=tmp_path)
+        (tmp_path / "app.py").write_text("print('hello')\n")
+        (tmp_path / "old.txt").write_text("stale\n")
+        _git("add", ".", cwd=tmp_path)
+        _git("-c", "user.name=dev", "-c", "user.email=dev@example.com", "commit", "-qm", "init", cwd=tmp_path)
+        _git("update-ref", "refs/remotes/origin/main", "HEAD", cwd=tmp_path)
+        _git("checkout", "-qb", "fix/xss", cwd=tmp_path)
+        (tmp_path / "app.py").write_text("print('patched')\n")
+        (tmp_path / "old.txt").unlink()
+
+        gh_repository = MagicMock()
+        gh_repository.create_git_blob.return_value.sha = "blob-sha"
+        gh_repository.create_pull.return_value.html_url = "https://github.com/octo/repo/pull/2"
+        # GitHub recreates the exact commit, so its sha matches the local one
+        gh_repository.create_git_commit.side_effect = lambda *_args, **_kwargs: MagicMock(
+            sha=str(pygit2.Repository(str(tmp_path)).head.target)
+        )
+        github_client = MagicMock()
+        github_client.get_repo.return_value = gh_repository
+
+        with patch.object(pygit2.remotes.Remote, "push") as push:
+            pr_url = await github_integration.create_pr_from_changes(
+                str(tmp_path), "Escape output", github_client, "octo/repo", "token"
+            )
+
+        assert pr_url == "https://github.com/octo/repo/pull/2"
+        push.assert_not_called()
+        elements = gh_repository.create_git_tree.call_args.args[0]
+        assert sorted((e._identity["path"], e._identity["sha"]) for e in elements) == [
+            ("app.py", "blob-sha"),
+            ("old.txt", None),
+        ]
+        local = pygit2.Repository(str(tmp_path))
+        gh_repository.create_git_ref.assert_called_once_with("refs/heads/fix/xss", str(local.head.target))
+        assert local.references["refs/remotes/origin/fix/xss"].target == local.head.target
+
+    @pytest.mark.asyncio
+    async def test_local_ref_failure_after_api_push_still_opens_pr(self, tmp_path: Path):
+        """Local ref bookkeeping errors after the remote branch moved don't fail the PR."""
+        _git("init", "-q", "-b", "main", cwd=tmp_path)
+        (tmp_path / "app.py").write_text("print('hello')\n")
+        _git("add", ".", cwd=tmp_path)
+        _git("-c", "user.name=dev", "-c", "user.email=dev@example.com", "commit", "-qm", "init", cwd=tmp_path)
+        _git("update-ref", "refs/remotes/origin/main", "HEAD", cwd=tmp_path)
+        _git("checkout", "-qb", "fix/xss", cwd=tmp_path)
+        (tmp_path / "app.py").write_text("print('patched')\n")
+
+        gh_repository = MagicMock()
+        gh_repository.create_git_blob.return_value.sha = "blob-sha"
+        gh_repository.create_pull.return_value.html_url = "https://github.com/octo/repo/pull/3"
+        # A different sha makes the local branch adopt GitHub's commit through a fetch
+        gh_repository.create_git_commit.return_value.sha = "0" * 40
+        github_client = MagicMock()
+        github_client.get_repo.return_value = gh_repository
+
+        with patch.object(pygit2.remotes.Remote, "push") as push, \
+             patch.object(pygit2.remotes.Remote, "fetch", side_effect=pygit2.GitError("network down")):
+            pr_url = await github_integration.create_pr_from_changes(
+                str(tmp_path), "Escape output", github_client, "octo/repo", "token"
+            )
+
+        assert pr_url == "https://github.com/octo/repo/pull/3"
+        push.assert_not_called()
+        gh_repository.create_git_ref.assert_called_once_with("refs/heads/fix/xss", "0" * 40)
+
+
+class TestReadOriginUrl:
+    """Test reading the origin remote from git config."""
+
+    def test_reads_origin_url(self, tmp_path: Path):
+        """The origin URL matches what git itself reports."""
+        _git("init", "-q", cwd=tmp_path)
+        _git("remote", "add", "origin", "https://github.com/octo/repo.git", cwd=tmp_path)
+
+        assert _read_origin_url(tmp_path) == "https://github.com/octo/repo.git"
+
+    def test_follows_worktree_gitdir(self, tmp_path: Path):
+        """Linked worktrees resolve to the main repository's config."""
+        main = tmp_path / "main"
+        main.mkdir()
+        _git("init", "-q", cwd=main)
+        _git("remote", "add", "origin", "git@github.com:octo/repo.git", cwd=main)
+        _git("-c", "user.name=t", "-c", "user.email=t@t", "commit", "-q", "--allow-empty", "-m", "init", cwd=main)
+        _git("worktree", "add", "-q", str(tmp_path / "wt"), cwd=main)
+
+        assert _read_origin_url(tmp_path / "wt") == "git@github.com:octo/repo.git"
+
+    def test_missing_origin(self, tmp_path: Path):
+        """A repository without an origin remote raises ValueError."""
+        _git("init", "-q", cwd=tmp_path)
+
+        with pytest.raises(ValueError, match="origin"):
+            _read_origin_url(tmp_path)
+
+    def test_not_a_repository(self, tmp_path: Path):
+        """A plain directory raises ValueError."""
+        with pytest.raises(ValueError, match="Not a git repository"):
+            _read_origin_url(tmp_path)
+
+
+class TestGitHubUrlPattern:
+    """Test extracting owner/repo from GitHub remote URLs."""
+
+    @pytest.mark.parametrize(
+        "url",
+        [
+            "https://github.com/octo/repo.git",
+            "https://github.com/octo/repo",
+            "https://github.com/octo/repo/",
+            "git@github.com:octo/repo.git",
+            "ssh://git@github.com/octo/repo.git",
+        ],
+    )
+    def test_extracts_owner_and_repo(self, url: str):
+        """HTTPS and SSH remotes all yield owner/repo."""
+        match = _GH_URL_RE.search(url)
+        assert match is not None
+        assert match.group(1) == "octo/repo"
+
+    def test_rejects_non_github_remote(self):
+        """Remotes on other hosts do not match."""
+        assert _GH_URL_RE.search("https://gitlab.com/octo/repo.git") is None
@@ -0,0 +1,53 @@
+"""Tests for the vulnerability tracking tools."""
+
+import asyncio
+from typing import Any
+
+import pytest
+
+from app.tools import add_vulnerability
+from app.utils import (
+    _vulnerability_session,  # pyright: ignore[reportPrivateUsage]
+    claude_add_vulnerability,
+)
+
+
+@pytest.mark.asyncio
+async def test_add_vulnerability_normalizes_fields() -> None:
+    """Test names and causes are stripped and the severity is lowercased."""
+    session_data: dict[str, Any] = {}
+
+    result = await add_vulnerability(
+        name="  SQL injection ", cause=" Unescaped query input\n", vuln_type=" HIGH", session_data=session_data
+    )
+
+    assert result["vulnerability"] == {"name": "SQL injection", "cause": "Unescaped query input", "type": "high"}
+    assert session_data["vulnerabilities"] == [result["vulnerability"]]
+    assert result["total_vulnerabilities"] == 1
+
+
+@pytest.mark.asyncio
+async def test_add_vulnerability_rejects_unknown_type() -> None:
+    """Test an unknown severity raises ValueError and records nothing."""
+    session_data: dict[str, Any] = {}
+
+    with pytest.raises(ValueError, match="Invalid vulnerability type 'severe'"):
+        await add_vulnerability(name="XSS", cause="Unescaped output", vuln_type="severe", session_data=session_data)
+
+    assert session_data == {}
+
+
+@pytest.mark.asyncio
+async def test_claude_tools_keep_findings_per_client() -> None:
+    """Test findings recorded through the Claude tools stay with the client that made them."""
+    args = {"name": "SSRF", "cause": "Unvalidated URL fetch", "vuln_type": "critical"}
+
+    async def run_client() -> dict[str, Any]:
+        _vulnerability_session.set({})
+        await claude_add_vulnerability.handler(args)
+        return _vulnerability_session.get()
+
+    first, second = await asyncio.gather(run_client(), run_client())
+
+    assert first is not second
+    assert len(first["vulnerabilities"]) == len(second["vulnerabilities"]) == 1
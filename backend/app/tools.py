@@ -4,10 +4,27 @@ Provides functions for recording security vulnerabilities and generating
 comprehensive reports with scoring and visualizations.
 """
 
-import json
-from typing import Any
+import io
+from collections import Counter
+from types import MappingProxyType
+from typing import Any, get_args
+
+import orjson
+from pydantic import ValidationError
 
 from app.core.log_config import logger
+from app.schemas.vulnerability import Severity, Vulnerability
+
+# Severity levels from most to least severe, with their risk score weights
+_SEVERITIES: tuple[str, ...] = get_args(Severity)
+_SEVERITY_WEIGHTS = MappingProxyType({"critical": 10, "high": 7, "medium": 4, "low": 1})
+# (minimum score, risk level, indicator), highest threshold first
+_RISK_BUCKETS = (
+    (25, "CRITICAL", "🔴"),
+    (15, "HIGH", "🟠"),
+    (8, "MEDIUM", "🟡"),
+    (0, "LOW", "🟢"),
+)
 
 
 async def add_vulnerability(
@@ -30,26 +47,23 @@ async def add_vulnerability(
     Raises:
         ValueError: If vuln_type is not one of the allowed values
     """
-    # Validate vulnerability type
-    allowed_types = {"critical", "high", "medium", "low"}
-    if vuln_type.lower() not in allowed_types:
-        raise ValueError(f"Invalid vulnerability type '{vuln_type}'. Must be one of: {', '.join(allowed_types)}")
+    try:
+        vulnerability = Vulnerability(name=name, cause=cause, type=vuln_type).model_dump()
+    except ValidationError as e:
+        if any(error["loc"] == ("type",) for error in e.errors()):
+            raise ValueError(
+                f"Invalid vulnerability type '{vuln_type}'. Must be one of: {', '.join(_SEVERITIES)}"
+            ) from e
+        raise
 
     # Initialize vulnerabilities list if it doesn't exist
     if "vulnerabilities" not in session_data:
         session_data["vulnerabilities"] = []
 
-    # Create vulnerability entry
-    vulnerability = {
-        "name": name.strip(),
-        "cause": cause.strip(),
-        "type": vuln_type.lower()
-    }
-
     # Add to session data
     session_data["vulnerabilities"].append(vulnerability)
 
-    logger.info(f"Added vulnerability: {name} ({vuln_type})")
+    logger.info(f"Added vulnerability: {vulnerability['name']} ({vulnerability['type']})")
 
     return {
         "success": True,
@@ -72,95 +86,66 @@ async def generate_full_report(session_data: dict[str, Any]) -> str:
     if not vulnerabilities:
         return "# Vulnerability Report\n\nNo vulnerabilities found in this session.\n\n```json\n{\"vulnerabilities\": []}\n```"
 
-    # Calculate severity scores
-    severity_weights = {
-        "critical": 10,
-        "high": 7,
-        "medium": 4,
-        "low": 1
-    }
-
-    # Count vulnerabilities by type
-    severity_counts = {"critical": 0, "high": 0, "medium": 0, "low": 0}
+    # Count by type, score, and build the details rows in a single pass
+    type_counts: Counter[str] = Counter()
     total_score = 0
+    detail_rows: list[str] = []
 
     for vuln in vulnerabilities:
         vuln_type = vuln.get("type", "low")
-        severity_counts[vuln_type] += 1
-        total_score += severity_weights.get(vuln_type, 1)
+        type_counts[vuln_type] += 1
+        total_score += _SEVERITY_WEIGHTS.get(vuln_type, 1)
+        name = vuln.get("name", "Unknown")
+        cause = vuln.get("cause", "Not specified").replace("\n", " ")
+        detail_rows.append(f"| {name} | {cause} | {vuln_type.upper()} |")
+
+    severity_counts = {severity: type_counts[severity] for severity in _SEVERITIES}
 
     # Determine overall risk level
-    if total_score >= 25:
-        risk_level = "CRITICAL"
-        risk_color = "🔴"
-    elif total_score >= 15:
-        risk_level = "HIGH"
-        risk_color = "🟠"
-    elif total_score >= 8:
-        risk_level = "MEDIUM"
-        risk_color = "🟡"
-    else:
-        risk_level = "LOW"
-        risk_color = "🟢"
+    risk_level, risk_color = next(
+        (level, color) for threshold, level, color in _RISK_BUCKETS if total_score >= threshold
+    )
 
     # Generate Mermaid pie chart
     chart_data: list[str] = []
-    for severity in ["critical", "high", "medium", "low"]:
-        count = severity_counts[severity]  # type: ignore
+    for severity in _SEVERITIES:
+        count = severity_counts[severity]
         if count > 0:
-            chart_data.append(f'    "{severity.upper()}: {count}" : {count}')  # type: ignore
+            chart_data.append(f'    "{severity.upper()}: {count}" : {count}')
 
     mermaid_chart = f"""```mermaid
 pie title Vulnerability Distribution
 {chr(10).join(chart_data)}
 ```"""
 
-    # Generate markdown report
-    report_lines = [
-        "# Vulnerability Assessment Report",
-        "",
-        f"## Risk Level: {risk_color} {risk_level}",
-        "",
-        f"**Total Vulnerabilities:** {len(vulnerabilities)}",
-        f"**Risk Score:** {total_score}/100",
-        "",
-        "## Severity Breakdown",
-        "",
-        "| Severity | Count | Weight |",
-        "|----------|-------|--------|",
-    ]
-
-    for severity in ["critical", "high", "medium", "low"]:
+    # Generate markdown report, written section by section into one buffer
+    buf = io.StringIO()
+    w = buf.write
+    w("# Vulnerability Assessment Report\n\n")
+    w(f"## Risk Level: {risk_color} {risk_level}\n\n")
+    w(f"**Total Vulnerabilities:** {len(vulnerabilities)}\n")
+    w(f"**Risk Score:** {total_score}/100\n\n")
+    w("## Severity Breakdown\n\n")
+    w("| Severity | Count | Weight |\n")
+    w("|----------|-------|--------|\n")
+
+    for severity in _SEVERITIES:
         count = severity_counts[severity]
-        weight = severity_weights[severity]
+        weight = _SEVERITY_WEIGHTS[severity]
         if count > 0:
-            report_lines.append(f"| {severity.upper()} | {count} | {weight} |")
-
-    report_lines.extend([
-        "",
-        "## Vulnerability Details",
-        "",
-        "| Name | Cause | Severity |",
-        "|------|-------|----------|",
-    ])
-
-    for vuln in vulnerabilities:
-        name = vuln.get("name", "Unknown")
-        cause = vuln.get("cause", "Not specified").replace("\n", " ")
-        vuln_type = vuln.get("type", "low").upper()
-        report_lines.append(f"| {name} | {cause} | {vuln_type} |")
-
-    report_lines.extend([
-        "",
-        "## Distribution Chart",
-        "",
-        mermaid_chart,
-        "",
-        "## Raw Data",
-        "",
-        "```json",
-        json.dumps({"vulnerabilities": vulnerabilities}, indent=2),
-        "```"
-    ])
-
-    return "\n".join(report_lines)
\ No newline at end of file
+            w(f"| {severity.upper()} | {count} | {weight} |\n")
+
+    w("\n## Vulnerability Details\n\n")
+    w("| Name | Cause | Severity |\n")
+    w("|------|-------|----------|\n")
+    w("\n".join(detail_rows))
+
+    w("\n\n## Distribution Chart\n\n")
+    w(mermaid_chart)
+    w("\n\n## Raw Data\n\n")
+    w("```json\n")
+    # orjson's indented output matches json.dumps(indent=2) but stays in C
+    w(orjson.dumps({"vulnerabilities": vulnerabilities}, option=orjson.OPT_INDENT_2).decode())
+    w("\n```")
+
+    return buf.getvalue()
\ No newline at end of file
@@ -4,32 +4,100 @@ Provides helper functions for common operations like UUID generation,
 timestamp creation, and request information extraction.
 """
 
+import asyncio
+import functools
+import os
+import time
 import uuid
+from collections.abc import AsyncGenerator, AsyncIterator, Callable
+from contextvars import ContextVar
 from datetime import datetime, timezone
 from enum import Enum
-from typing import Any, TypeVar
-
+from types import MappingProxyType
+from typing import Any, Final, TypedDict, TypeVar, cast
+
+import orjson
+import uuid_utils.compat
+from claude_code_sdk import (  # type: ignore
+    AssistantMessage,
+    ClaudeCodeOptions,
+    ClaudeSDKClient,
+    ResultMessage,
+    SystemMessage,
+    TextBlock,
+    ToolResultBlock,
+    ToolUseBlock,
+    UserMessage,
+    create_sdk_mcp_server,
+    tool,
+)
 from fastapi import Request
 
 from app.core.config import settings
 from app.core.log_config import logger
-
-# Claude SDK types will be imported at runtime where needed
+from app.tools import add_vulnerability, generate_full_report
 
 # Logger is now configured via app.core.log_config
 
 # Type variables for generic functions
 T = TypeVar("T")
 
+# Credential-bearing headers left out of request_info. ASGI only recommends lowercase
+# header names, so names are still lowercased before the lookup.
+_REDACTED_HEADERS: Final[frozenset[str]] = frozenset({"authorization", "cookie", "proxy-authorization", "x-api-key"})
+
+# Messages buffered between the Claude SDK and a slow streaming client
+_STREAM_QUEUE_SIZE = 32
+# Coalesced NDJSON lines are flushed once a write reaches this size
+_STREAM_BATCH_BYTES = 16 * 1024
+# Speaker labels for the stored message types replayed as conversation context
+_HISTORY_ROLES = MappingProxyType({"user": "User", "assistant": "Assistant"})
+# One NDJSON line per message; tool inputs and results may carry non-string keys
+_dump_ndjson = functools.partial(orjson.dumps, option=orjson.OPT_APPEND_NEWLINE | orjson.OPT_NON_STR_KEYS)
+_STREAM_END = object()
+
+# Last log timestamp as (epoch milliseconds, ISO string); bursts within one
+# millisecond share the string. Tuple assignment is atomic, so no lock is needed.
+_ts_cache: tuple[int, str] = (0, "")
+# Logger pre-bound with the fields every structured event carries; settings don't change after startup
+_event_logger = logger.bind(service=settings.PROJECT_NAME, environment=settings.ENVIRONMENT)
+
 
 class LogLevel(str, Enum):
-    """Log levels for structured logging."""
+    """Log levels for structured logging.
+
+    Each member's value is the name of the matching logger method, and ``no``
+    is Loguru's severity number for it.
+    """
 
-    DEBUG = "debug"
-    INFO = "info"
-    WARNING = "warning"
-    ERROR = "error"
-    CRITICAL = "critical"
+    no: int
+
+    def __new__(cls, value: str, no: int) -> "LogLevel":
+        # str.__new__ is typed as returning a plain str; the instance is our enum member
+        member = cast("LogLevel", str.__new__(cls, value))
+        member._value_ = value
+        member.no = no
+        return member
+
+    DEBUG = ("debug", 10)
+    INFO = ("info", 20)
+    WARNING = ("warning", 30)
+    ERROR = ("error", 40)
+    CRITICAL = ("critical", 50)
+
+
+def _log_timestamp() -> str:
+    """Return the current UTC time as an ISO 8601 string with millisecond precision."""
+    global _ts_cache
+
+    bucket = time.time_ns() // 1_000_000
+    cached_bucket, timestamp = _ts_cache
+    if bucket != cached_bucket:
+        seconds, millis = divmod(bucket, 1000)
+        # Same text as datetime.isoformat(timespec="milliseconds") on an aware UTC datetime
+        timestamp = f"{time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(seconds))}.{millis:03d}+00:00"
+        _ts_cache = (bucket, timestamp)
+    return timestamp
 
 
 def log_event(
@@ -46,41 +114,34 @@ def log_event(
         details: Optional dictionary with additional event details
         **kwargs: Additional key-value pairs to include in the log
     """
-    log_data: dict[str, Any] = {
-        "timestamp": datetime.now(timezone.utc).isoformat(),
-        "service": settings.PROJECT_NAME,
-        "environment": settings.ENVIRONMENT,
-        "event_type": event_type,
-        **kwargs,
-    }
+    # Nothing below the lowest handler level gets emitted, so skip building the record.
+    # Loguru has no public accessor for this; handlers can change at runtime, so read it per call.
+    if level.no < logger._core.min_level:  # type: ignore[attr-defined]
+        return
+
+    log_data: dict[str, Any] = {"timestamp": _log_timestamp(), "event_type": event_type, **kwargs}
 
     if details:
         log_data["details"] = details
 
     # Use Loguru's bind() for proper structured logging that preserves context
-    # This ensures all fields appear in JSON output and in Sentry breadcrumbs
+    # This ensures all fields appear in JSON output and in Sentry breadcrumbs;
+    # only the per-event fields are bound here, on top of the shared ones
     message = f"Event: {event_type}"
-    bound_logger = logger.bind(**log_data)
-    
-    if level == LogLevel.DEBUG:
-        bound_logger.debug(message)
-    elif level == LogLevel.INFO:
-        bound_logger.info(message)
-    elif level == LogLevel.WARNING:
-        bound_logger.warning(message)
-    elif level == LogLevel.ERROR:
-        bound_logger.error(message)
-    elif level == LogLevel.CRITICAL:
-        bound_logger.critical(message)
+    bound_logger = _event_logger.bind(**log_data)
+    # LogLevel values are the names of the matching logger methods
+    getattr(bound_logger, level.value)(message)
 
 
 def generate_uuid() -> uuid.UUID:
     """Generate a random UUID.
 
+    Uses uuid-utils' Rust generator; the compat module returns stdlib UUIDs.
+
     Returns:
         A new random UUID
     """
-    return uuid.uuid4()
+    return uuid_utils.compat.uuid4()
 
 
 def request_info(request: Request) -> dict[str, Any]:
@@ -96,11 +157,28 @@ def request_info(request: Request) -> dict[str, Any]:
         "method": request.method,
         "url": str(request.url),
         "client_host": request.client.host if request.client else "unknown",
-        "headers": {k: v for k, v in request.headers.items() if k.lower() not in ["authorization"]},
+        "headers": {k: v for k, v in request.headers.items() if k.lower() not in _REDACTED_HEADERS},
     }
 
 
-def paginate_response(items: list[T], count: int, skip: int, limit: int) -> dict[str, Any]:
+class Pagination(TypedDict):
+    """Pagination metadata for a list response."""
+
+    total: int
+    page: int
+    pages: int
+    has_more: bool
+
+
+class Paginated(TypedDict):
+    """A page of items with its pagination metadata."""
+
+    # Generic TypedDicts need Python 3.11; the project still supports 3.10
+    data: list[Any]
+    pagination: Pagination
+
+
+def paginate_response(items: list[T], count: int, skip: int, limit: int) -> Paginated:
     """Create a paginated response.
 
     Args:
@@ -112,12 +190,17 @@ def paginate_response(items: list[T], count: int, skip: int, limit: int) -> dict
     Returns:
         Dictionary with pagination information
     """
+    if limit > 0:
+        page = skip // limit + 1
+        pages = -(-count // limit)  # ceiling division
+    else:
+        page = pages = 1
     return {
         "data": items,
         "pagination": {
             "total": count,
-            "page": skip // limit + 1 if limit > 0 else 1,
-            "pages": (count + limit - 1) // limit if limit > 0 else 1,
+            "page": page,
+            "pages": pages,
             "has_more": (skip + limit) < count,
         },
     }
@@ -126,7 +209,7 @@ def paginate_response(items: list[T], count: int, skip: int, limit: int) -> dict
 # Claude Code SDK utilities
 
 # Cybersecurity system prompt for Claude AI agent
-CYBERSECURITY_SYSTEM_PROMPT = """
+CYBERSECURITY_SYSTEM_PROMPT: Final[str] = """\
 You are an expert cybersecurity software engineer specializing in auditing MCP (Model Context Protocol) servers.
 
 Your primary task is to analyze MCP server capabilities and identify security vulnerabilities. Always approach your analysis systematically, using the SAFE-MCP framework provided below.
@@ -327,8 +410,64 @@ The SAFE-MCP framework defines 14 tactics that align with the MITRE ATT&CK metho
 
 Use the tool `mcp__vulnerability__add_vulnerability` every time you identify a new vulnerability.
 
-After finishing your analysis in Analysis Mode, use the tool `mcp__vulnerability__generate_full_report` to generate a full report.
-""".strip()
+After finishing your analysis in Analysis Mode, use the tool `mcp__vulnerability__generate_full_report` to generate a full report."""
+
+
+# Vulnerabilities recorded by the tools below, one dict per Claude client
+_vulnerability_session: ContextVar[dict[str, Any]] = ContextVar("vulnerability_session")
+
+
+@tool("add_vulnerability", "Add a security vulnerability to tracking", {
+    "name": str,
+    "cause": str,
+    "vuln_type": str
+})
+async def claude_add_vulnerability(args: dict[str, Any]) -> dict[str, Any]:
+    """Add a vulnerability using the MCP tool interface."""
+    try:
+        result = await add_vulnerability(
+            name=args["name"],
+            cause=args["cause"],
+            vuln_type=args["vuln_type"],
+            session_data=_vulnerability_session.get()
+        )
+        return {
+            "content": [
+                {"type": "text", "text": f"✅ Vulnerability added: {result['vulnerability']['name']} ({result['vulnerability']['type']})"}
+            ]
+        }
+    except ValueError as e:
+        return {
+            "content": [
+                {"type": "text", "text": f"❌ Error: {str(e)}"}
+            ]
+        }
+
+
+@tool("generate_full_report", "Generate comprehensive vulnerability report", {})
+async def claude_generate_report(args: dict[str, Any]) -> dict[str, Any]:
+    """Generate a full vulnerability report using the MCP tool interface."""
+    try:
+        report = await generate_full_report(_vulnerability_session.get())
+        return {
+            "content": [
+                {"type": "text", "text": report}
+            ]
+        }
+    except Exception as e:
+        return {
+            "content": [
+                {"type": "text", "text": f"❌ Error generating report: {str(e)}"}
+            ]
+        }
+
+
+# The tool handlers are stateless, so every client shares one in-process server
+_VULNERABILITY_SERVER = create_sdk_mcp_server(
+    name="vulnerability-tools",
+    version="1.0.0",
+    tools=[claude_add_vulnerability, claude_generate_report]
+)
 
 
 async def create_claude_client(options: dict[str, Any] | None = None, cwd: str | None = None) -> Any:
@@ -343,75 +482,19 @@ async def create_claude_client(options: dict[str, Any] | None = None, cwd: str |
     Raises:
         ValueError: If ANTHROPIC_API_KEY is not configured
     """
-    from claude_code_sdk import ClaudeCodeOptions, ClaudeSDKClient, create_sdk_mcp_server  # type: ignore
-
     if not settings.ANTHROPIC_API_KEY:
         raise ValueError("ANTHROPIC_API_KEY must be configured in environment variables")
 
-    # Set API key in environment for SDK
-    import os
-    os.environ["ANTHROPIC_API_KEY"] = settings.ANTHROPIC_API_KEY
+    # The SDK reads the key from the environment; only write it (a putenv call) when it changed
+    if os.environ.get("ANTHROPIC_API_KEY") != settings.ANTHROPIC_API_KEY:
+        os.environ["ANTHROPIC_API_KEY"] = settings.ANTHROPIC_API_KEY
 
-    # Create vulnerability tracking MCP server with proper tool decorators
-    from claude_code_sdk import tool
-
-    # Global session storage for tools (in production, use proper persistence)
-    SESSION_DATA: dict[str, Any] = {}
-
-    @tool("add_vulnerability", "Add a security vulnerability to tracking", {
-        "name": str,
-        "cause": str,
-        "vuln_type": str
-    })
-    async def claude_add_vulnerability(args: dict[str, Any]) -> dict[str, Any]:
-        """Add a vulnerability using the MCP tool interface."""
-        try:
-            from app.tools import add_vulnerability
-            result = await add_vulnerability(
-                name=args["name"],
-                cause=args["cause"],
-                vuln_type=args["vuln_type"],
-                session_data=SESSION_DATA
-            )
-            return {
-                "content": [
-                    {"type": "text", "text": f"✅ Vulnerability added: {result['vulnerability']['name']} ({result['vulnerability']['type']})"}
-                ]
-            }
-        except ValueError as e:
-            return {
-                "content": [
-                    {"type": "text", "text": f"❌ Error: {str(e)}"}
-                ]
-            }
-
-    @tool("generate_full_report", "Generate comprehensive vulnerability report", {})
-    async def claude_generate_report(args: dict[str, Any]) -> dict[str, Any]:
-        """Generate a full vulnerability report using the MCP tool interface."""
-        try:
-            from app.tools import generate_full_report
-            report = await generate_full_report(SESSION_DATA)
-            return {
-                "content": [
-                    {"type": "text", "text": report}
-                ]
-            }
-        except Exception as e:
-            return {
-                "content": [
-                    {"type": "text", "text": f"❌ Error generating report: {str(e)}"}
-                ]
-            }
-
-    vulnerability_server = create_sdk_mcp_server(
-        name="vulnerability-tools",
-        version="1.0.0",
-        tools=[claude_add_vulnerability, claude_generate_report]
-    )
+    # Each client tracks its own findings; the SDK's reader task inherits this context
+    _vulnerability_session.set({})
 
     # Configure options
     claude_options = ClaudeCodeOptions(
-        mcp_servers={"vulnerability": vulnerability_server},
+        mcp_servers={"vulnerability": _VULNERABILITY_SERVER},
         allowed_tools=["mcp__vulnerability__add_vulnerability", "mcp__vulnerability__generate_full_report"]
     )
 
@@ -431,9 +514,13 @@ async def create_claude_client(options: dict[str, Any] | None = None, cwd: str |
     return ClaudeSDKClient(options=claude_options)
 
 
-async def query_claude_stream(prompt: str, options: dict[str, Any] | None = None, session_id: str | None = None, db_session: Any = None, cwd: str | None = None):
+async def query_claude_stream(prompt: str, options: dict[str, Any] | None = None, session_id: str | None = None, db_session: Any = None, cwd: str | None = None) -> AsyncGenerator[bytes, None]:
     """Query Claude Code SDK and yield streaming responses with conversation persistence.
 
+    SDK messages are read by a producer task into a bounded queue, so a client that
+    drains the stream slowly applies backpressure instead of growing memory. Messages
+    that have queued up while the client was being written to go out as one chunk.
+
     Args:
         prompt: The query prompt to send to Claude
         options: Optional configuration options
@@ -441,174 +528,200 @@ async def query_claude_stream(prompt: str, options: dict[str, Any] | None = None
         db_session: Database session for session management
 
     Yields:
-        JSON-encoded strings of Claude messages for streaming
+        Chunks of one or more NDJSON lines (bytes) of Claude messages for streaming
     """
-    import json
-
-    # Import types at runtime for isinstance checks
-
     # Handle session continuation
     final_prompt = prompt
-    conversation_history = []
 
     if session_id and db_session:
-        from app.crud import get_claude_session
-        existing_session = await get_claude_session(session=db_session, session_id=session_id)
-        if existing_session and existing_session.session_data:
-            # Load existing conversation history
-            conversation_history = existing_session.session_data.get("messages", [])
-            # Format history for Claude context
-            if conversation_history:
-                history_text = "\n".join([
-                    f"{'User' if msg.get('type') == 'user' else 'Assistant'}: {msg.get('content', [{}])[0].get('text', '')}"
-                    for msg in conversation_history[-10:]  # Keep last 10 messages for context
-                    if msg.get('type') in ['user', 'assistant']
-                ])
-                final_prompt = f"Previous conversation:\n{history_text}\n\nCurrent user message: {prompt}"
+        from app.crud import get_recent_claude_session_messages
+        # Only the tail of the history is replayed, so only the tail is read
+        recent_messages = await get_recent_claude_session_messages(
+            session=db_session, session_id=session_id, limit=10  # Keep last 10 messages for context
+        )
+        # Format history for Claude context
+        if recent_messages:
+            history_text = "\n".join(
+                f"{role}: {content[0].get('text', '') if (content := msg.get('content')) else ''}"
+                for msg in recent_messages
+                if (role := _HISTORY_ROLES.get(msg.get('type', ''))) is not None
+            )
+            final_prompt = f"Previous conversation:\n{history_text}\n\nCurrent user message: {prompt}"
 
     async with await create_claude_client(options, cwd) as client:
         await client.query(final_prompt)  # type: ignore
 
-        # Collect all messages for session storage
-        all_messages = []
-
-        async for message in client.receive_response():  # type: ignore
-            message_dict = _convert_sdk_message_to_dict(message)
-            all_messages.append(message_dict)
-            yield json.dumps(message_dict) + "\n"
+        # Messages to store in the session history; system messages are left out
+        history_messages: list[dict[str, Any]] = []
+        queue: asyncio.Queue[Any] = asyncio.Queue(maxsize=_STREAM_QUEUE_SIZE)
 
-        # Update session data after streaming completes
-        if session_id and db_session:
+        async def produce() -> None:
+            cancelled = False
+            try:
+                async for message in client.receive_response():  # type: ignore
+                    await queue.put(_convert_sdk_message_to_dict(message))
+            except asyncio.CancelledError:
+                cancelled = True
+                raise
+            finally:
+                # Cancellation means the consumer is gone, and with the queue full the
+                # sentinel would never be taken; otherwise the consumer is waiting for it
+                if not cancelled:
+                    await queue.put(_STREAM_END)
+
+        producer = asyncio.create_task(produce())
+        try:
+            async for chunk in _drain_stream_queue(queue, history_messages):
+                yield chunk
+            # Surface any error raised while reading from the SDK
+            await producer
+        finally:
+            if not producer.done():
+                producer.cancel()
+                # wait() doesn't raise the producer's CancelledError, while a
+                # cancellation aimed at this generator still propagates
+                await asyncio.wait([producer])
+
+        # Append this turn to the session history after streaming completes; a turn
+        # that produced nothing to keep (e.g. it failed early) isn't written at all
+        if session_id and db_session and history_messages:
             try:
-                from app.crud import ClaudeSessionUpdate, get_claude_session, update_claude_session
-
-                # Get the existing session from database
-                existing_session = await get_claude_session(session=db_session, session_id=session_id)
-                if existing_session:
-                    # Add current user message to history
-                    user_message = {
-                        "type": "user",
-                        "content": [{"type": "text", "text": prompt}],
-                        "timestamp": datetime.now(timezone.utc).isoformat()
-                    }
-                    conversation_history.append(user_message)
-
-                    # Add all Claude responses to history
-                    for msg in all_messages:
-                        if msg.get("type") != "system":  # Don't store system messages in history
-                            conversation_history.append(msg)
-
-                    # Keep only last 20 messages to prevent context from getting too long
-                    if len(conversation_history) > 20:
-                        conversation_history = conversation_history[-20:]
-
-                    # Update session in database
-                    session_update = ClaudeSessionUpdate(session_data={"messages": conversation_history})
-                    await update_claude_session(
-                        session=db_session,
-                        db_session=existing_session,
-                        session_in=session_update
-                    )
+                from app.crud import add_claude_session_messages
+
+                # One timestamp for the whole turn, also used for SDK messages that carry none
+                turn_timestamp = datetime.now(timezone.utc).isoformat()
+                user_message = {
+                    "type": "user",
+                    "content": [{"type": "text", "text": prompt}],
+                    "timestamp": turn_timestamp,
+                }
+                for message_dict in history_messages:
+                    if message_dict.get("timestamp") is None:
+                        message_dict["timestamp"] = turn_timestamp
+                stored = await add_claude_session_messages(
+                    session=db_session, session_id=session_id, messages=[user_message, *history_messages]
+                )
+                if not stored:
+                    logger.warning(f"Claude session {session_id} not found; turn history not saved")
             except Exception as e:
-                # Log error but don't fail the response
+                # Log error but don't fail the response; roll back so the session stays usable
                 logger.error(f"Failed to update session data: {e}")
+                await db_session.rollback()
 
 
-def _convert_sdk_message_to_dict(message: Any) -> dict[str, Any]:
-    """Convert SDK message objects to dictionary format for API responses.
+async def _drain_stream_queue(queue: "asyncio.Queue[Any]", history_messages: list[dict[str, Any]]) -> AsyncIterator[bytes]:
+    """Encode queued messages as NDJSON until the producer signals the end.
+
+    Messages that are already queued are coalesced into one chunk, so bursts of
+    small messages don't each cost a socket write; nothing waits for more.
 
     Args:
-        message: SDK message object
+        queue: Converted messages followed by the _STREAM_END sentinel
+        history_messages: Receives every non-system message, in order
 
-    Returns:
-        Dictionary representation of the message
+    Yields:
+        Chunks of one or more NDJSON lines
     """
-    # Import SDK classes at runtime to avoid type checking issues
-    try:
-        from claude_code_sdk import (  # type: ignore
-            AssistantMessage,
-            ResultMessage,
-            SystemMessage,
-            TextBlock,
-            ToolResultBlock,
-            ToolUseBlock,
-            UserMessage,
-        )
-    except ImportError:
-        # Fallback if SDK is not available
-        return {
-            "id": getattr(message, "id", None),
-            "timestamp": getattr(message, "timestamp", None),
-            "type": "unknown",
-            "content": str(message),
-        }
+    batch = bytearray()
+    finished = False
+    while not finished:
+        message_dict = await queue.get()
+        while True:
+            if message_dict is _STREAM_END:
+                finished = True
+                break
+            if message_dict.get("type") != "system":
+                history_messages.append(message_dict)
+            batch += _dump_ndjson(message_dict)
+            if len(batch) >= _STREAM_BATCH_BYTES or queue.empty():
+                break
+            message_dict = queue.get_nowait()
+        if batch:
+            yield bytes(batch)
+            batch.clear()
 
-    base_message = {
-        "id": getattr(message, "id", None),
-        "timestamp": getattr(message, "timestamp", None),
+
+def _text_block(block: Any) -> dict[str, Any]:
+    """Convert a TextBlock."""
+    return {"type": "text", "text": block.text}
+
+
+def _tool_use_block(block: Any) -> dict[str, Any]:
+    """Convert a ToolUseBlock."""
+    return {"type": "tool_use", "id": block.id, "name": block.name, "input": block.input}
+
+
+def _tool_result_block(block: Any) -> dict[str, Any]:
+    """Convert a ToolResultBlock."""
+    return {"type": "tool_result", "tool_use_id": block.tool_use_id, "content": block.content}
+
+
+# Content blocks kept for each message role; other block types are dropped
+_USER_BLOCKS: dict[type, Callable[[Any], dict[str, Any]]] = {
+    TextBlock: _text_block,
+    ToolResultBlock: _tool_result_block,
+}
+_ASSISTANT_BLOCKS: dict[type, Callable[[Any], dict[str, Any]]] = {
+    TextBlock: _text_block,
+    ToolUseBlock: _tool_use_block,
+}
+
+
+def _convert_blocks(blocks: Any, converters: dict[type, Callable[[Any], dict[str, Any]]]) -> list[dict[str, Any]]:
+    """Convert the content blocks that have a converter, skipping the rest."""
+    return [convert(block) for block in blocks if (convert := converters.get(type(block))) is not None]
+
+
+def _user_message(message: Any) -> dict[str, Any]:
+    """Convert a UserMessage."""
+    return {"type": "user", "content": _convert_blocks(message.content, _USER_BLOCKS)}
+
+
+def _assistant_message(message: Any) -> dict[str, Any]:
+    """Convert an AssistantMessage."""
+    return {"type": "assistant", "content": _convert_blocks(message.content, _ASSISTANT_BLOCKS)}
+
+
+def _system_message(message: Any) -> dict[str, Any]:
+    """Convert a SystemMessage."""
+    return {"type": "system", "content": [{"type": "text", "text": getattr(message, "content", "")}]}
+
+
+def _result_message(message: Any) -> dict[str, Any]:
+    """Convert a ResultMessage."""
+    return {
+        "type": "result",
+        "total_cost_usd": message.total_cost_usd,
+        "is_error": getattr(message, "is_error", False),
     }
 
-    # Use string-based type checking to avoid isinstance issues with dynamic imports
-    message_type = type(message).__name__
-
-    if message_type == "UserMessage":
-        content: list[dict[str, Any]] = []
-        for block in message.content:  # type: ignore
-            block_type = type(block).__name__
-            if block_type == "TextBlock":
-                content.append({"type": "text", "text": block.text})  # type: ignore
-            elif block_type == "ToolResultBlock":
-                content.append({
-                    "type": "tool_result",
-                    "tool_use_id": block.tool_use_id,  # type: ignore
-                    "content": block.content,  # type: ignore
-                })
 
-        return {
-            **base_message,
-            "type": "user",
-            "content": content,
-        }
+def _unknown_message(message: Any) -> dict[str, Any]:
+    """Fallback for message types without a converter."""
+    return {"type": "unknown", "content": str(message)}
 
-    elif message_type == "AssistantMessage":
-        content: list[dict[str, Any]] = []
-        for block in message.content:  # type: ignore
-            block_type = type(block).__name__
-            if block_type == "TextBlock":
-                content.append({"type": "text", "text": block.text})  # type: ignore
-            elif block_type == "ToolUseBlock":
-                content.append({
-                    "type": "tool_use",
-                    "id": block.id,  # type: ignore
-                    "name": block.name,  # type: ignore
-                    "input": block.input,  # type: ignore
-                })
 
-        return {
-            **base_message,
-            "type": "assistant",
-            "content": content,
-        }
+# Dispatch on the exact SDK class, one dict lookup per message
+_MESSAGE_CONVERTERS: dict[type, Callable[[Any], dict[str, Any]]] = {
+    UserMessage: _user_message,
+    AssistantMessage: _assistant_message,
+    SystemMessage: _system_message,
+    ResultMessage: _result_message,
+}
 
-    elif message_type == "SystemMessage":
-        return {
-            **base_message,
-            "type": "system",
-            "content": [{"type": "text", "text": getattr(message, "content", "")}],
-        }
 
-    elif message_type == "ResultMessage":
-        return {
-            **base_message,
-            "type": "result",
-            "total_cost_usd": message.total_cost_usd,  # type: ignore
-            "is_error": getattr(message, "is_error", False),
-        }
+def _convert_sdk_message_to_dict(message: Any) -> dict[str, Any]:
+    """Convert SDK message objects to dictionary format for API responses.
 
-    else:
-        # Fallback for unknown message types
-        return {
-            **base_message,
-            "type": "unknown",
-            "content": str(message),
-        }
+    Args:
+        message: SDK message object
+
+    Returns:
+        Dictionary representation of the message
+    """
+    convert = _MESSAGE_CONVERTERS.get(type(message), _unknown_message)
+    return {
+        "id": getattr(message, "id", None),
+        "timestamp": getattr(message, "timestamp", None),
+        **convert(message),
+    }
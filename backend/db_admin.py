@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""Database admin commands sharing one engine connection.
+
+Usage: python db_admin.py COMMAND [COMMAND ...]
+
+Commands run in the order given on a single connection, so back-to-back
+flows like "create check" don't each set up and tear down their own
+engine and event loop.
+"""
+
+import asyncio
+import sys
+from collections.abc import Awaitable, Callable
+
+from sqlalchemy import Connection, inspect
+from sqlalchemy.ext.asyncio import AsyncConnection
+from sqlmodel import SQLModel
+
+from app.core.db import engine
+from app.models import ClaudeSession  # noqa: F401  # registers the tables on SQLModel.metadata
+
+
+async def create_tables(conn: AsyncConnection) -> None:
+    """Create all database tables."""
+    await conn.run_sync(SQLModel.metadata.create_all)
+    print("✅ Database tables created successfully!")
+
+
+async def check_tables(conn: AsyncConnection) -> None:
+    """Check what tables exist in the database."""
+    tables, columns = await conn.run_sync(_reflect_tables)
+    print("Tables:", tables)
+
+    # Check ClaudeSession table structure if it exists
+    if columns is not None:
+        print("ClaudeSession columns:", columns)
+
+
+def _reflect_tables(sync_conn: Connection) -> tuple[list[str], list[tuple[str, str]] | None]:
+    """Reflect table names and the ClaudeSession columns through one inspector."""
+    inspector = inspect(sync_conn)
+    tables = inspector.get_table_names()
+    if 'ClaudeSession' not in tables:
+        return tables, None
+    columns = [(column["name"], str(column["type"])) for column in inspector.get_columns('ClaudeSession')]
+    return tables, columns
+
+
+COMMANDS: dict[str, Callable[[AsyncConnection], Awaitable[None]]] = {
+    "create": create_tables,
+    "check": check_tables,
+}
+
+
+async def main(commands: list[str]) -> None:
+    """Run the given commands in order on one connection, then dispose the engine."""
+    try:
+        async with engine.begin() as conn:
+            for command in commands:
+                await COMMANDS[command](conn)
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    commands = sys.argv[1:]
+    unknown = [command for command in commands if command not in COMMANDS]
+    if not commands or unknown:
+        sys.exit(f"usage: {sys.argv[0]} {{{','.join(COMMANDS)}}} [...]")
+    asyncio.run(main(commands))
@@ -0,0 +1,32 @@
+#!/usr/bin/env python3
+"""One-shot migration converting ClaudeSession.session_data to JSONB.
+
+Tables are created with SQLModel.metadata.create_all, which never alters an
+existing column, so databases created before session_data became JSONB need
+this run once. Safe to re-run.
+"""
+
+import asyncio
+
+from sqlalchemy import text
+
+from app.core.db import engine
+
+
+async def migrate():
+    """Convert session_data to JSONB and add its GIN index."""
+    async with engine.begin() as conn:
+        await conn.execute(
+            text('ALTER TABLE "ClaudeSession" ALTER COLUMN session_data TYPE jsonb USING session_data::jsonb')
+        )
+        await conn.execute(
+            text(
+                'CREATE INDEX IF NOT EXISTS "ClaudeSession_session_data_gin_idx" '
+                'ON "ClaudeSession" USING gin (session_data)'
+            )
+        )
+    print("✅ ClaudeSession.session_data migrated to JSONB")
+
+
+if __name__ == "__main__":
+    asyncio.run(migrate())
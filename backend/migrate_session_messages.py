@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""One-shot migration moving Claude session history into ClaudeSessionMessage.
+
+Creates the ClaudeSessionMessage table if it is missing and copies each
+session's ``session_data["messages"]`` into it, numbered from 1 in stored
+order. Sessions that already have message rows are skipped, so it is safe to
+re-run.
+"""
+
+import asyncio
+from typing import Any
+
+from sqlalchemy import Connection, exists, insert
+from sqlmodel import SQLModel, col, select
+
+from app.core.db import engine
+from app.models import ClaudeSession, ClaudeSessionMessage
+
+message_table = SQLModel.metadata.tables["ClaudeSessionMessage"]
+
+
+def _create_message_table(sync_conn: Connection) -> None:
+    """Create the ClaudeSessionMessage table unless it already exists."""
+    message_table.create(sync_conn, checkfirst=True)
+
+
+async def migrate():
+    """Create ClaudeSessionMessage and backfill it from session_data."""
+    async with engine.begin() as conn:
+        await conn.run_sync(_create_message_table)
+        pending = await conn.execute(
+            select(ClaudeSession.id).where(
+                ~exists().where(col(ClaudeSessionMessage.session_id) == col(ClaudeSession.id))
+            )
+        )
+        session_ids = pending.scalars().all()
+
+        migrated = 0
+        for session_id in session_ids:
+            session_data = (await conn.execute(
+                select(ClaudeSession.session_data).where(col(ClaudeSession.id) == session_id)
+            )).scalar_one()
+            messages: Any = (session_data or {}).get("messages")
+            if not isinstance(messages, list) or not messages:
+                continue
+            await conn.execute(insert(message_table), [
+                {"session_id": session_id, "seq": seq, "role": message.get("type", "unknown"), "content_json": message}
+                for seq, message in enumerate(messages, start=1)
+            ])
+            migrated += 1
+    print(f"✅ Session history moved to ClaudeSessionMessage for {migrated} session(s)")
+
+
+if __name__ == "__main__":
+    asyncio.run(migrate())
@@ -13,11 +13,12 @@ async def test_server_tools():
     print("Testing MCP Server Tools:")
     print("=" * 40)
     
-    # Test say_hello tool
-    result1 = mcp.get_tool("say_hello")("Alice")
+    # Test say_hello tool; look it up once and reuse it for both calls
+    say_hello = mcp.get_tool("say_hello")
+    result1 = say_hello("Alice")
     print(f"say_hello('Alice'): {result1}")
     
-    result2 = mcp.get_tool("say_hello")()  # Default parameter
+    result2 = say_hello()  # Default parameter
     print(f"say_hello(): {result2}")
     
     # Test get_server_info tool